@@ -0,0 +1,175 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class AdmissionTimeout(TimeoutError):
+    pass
+
+
+class AdmissionCancelled(Exception):
+    pass
+
+
+class _Ticket:
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.enqueued = time.monotonic()
+        self.admitted = False
+
+
+# ---------------------------------------------------------
+# Admission Control (process-wide limit, round-robin across sessions)
+# ---------------------------------------------------------
+class AdmissionController:
+    QUEUE_METRIC = "explorer_admission_queue_depth"
+    RUNNING_METRIC = "explorer_admission_running"
+    WAIT_METRIC = "explorer_admission_wait_seconds"
+    TIMEOUT_METRIC = "explorer_admission_timeouts_total"
+
+    def __init__(self, max_concurrent: int, registry=None, timeout: float = None, poll_interval: float = 0.5):
+        self.max_concurrent = max_concurrent
+        self.registry = registry
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.admitted = 0
+        self.timeouts = 0
+        self._queues = {}
+        self._order = deque()
+        self._running = 0
+        self._cond = threading.Condition()
+
+        if registry is not None:
+            registry.describe(self.QUEUE_METRIC, "BigQuery jobs waiting for an admission slot.")
+            registry.describe(self.RUNNING_METRIC, "BigQuery jobs holding an admission slot.")
+            registry.describe(self.WAIT_METRIC, "Time spent waiting for an admission slot.")
+            registry.describe(self.TIMEOUT_METRIC, "Jobs that gave up waiting for an admission slot.")
+            self._export()
+
+    # -----------------------------
+    # Public API
+    # -----------------------------
+    @contextmanager
+    def admit(self, session_id: str, on_wait=None, cancelled=None):
+        # on_wait(position, waited_seconds) runs on the caller's thread while queued;
+        # cancelled() is polled alongside it and gives up the place in the queue
+        ticket = self._enqueue(session_id)
+        try:
+            self._wait(ticket, on_wait, cancelled)
+        except BaseException:
+            self._abandon(ticket)
+            raise
+
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._running -= 1
+                self._dispatch()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "max_concurrent": self.max_concurrent,
+                "running": self._running,
+                "queued": sum(len(q) for q in self._queues.values()),
+                "queued_by_session": {sid: len(q) for sid, q in self._queues.items()},
+                "admitted": self.admitted,
+                "timeouts": self.timeouts,
+            }
+
+    # -----------------------------
+    # Internals
+    # -----------------------------
+    def _enqueue(self, session_id: str) -> _Ticket:
+        ticket = _Ticket(session_id)
+        with self._cond:
+            if self._running < self.max_concurrent and not self._order:
+                self._grant(ticket)
+            else:
+                self._queues.setdefault(session_id, deque()).append(ticket)
+                if session_id not in self._order:
+                    self._order.append(session_id)
+            self._export()
+        return ticket
+
+    def _wait(self, ticket: _Ticket, on_wait, cancelled=None):
+        while True:
+            with self._cond:
+                waited = time.monotonic() - ticket.enqueued
+                if ticket.admitted:
+                    break
+                if cancelled is not None and cancelled():
+                    raise AdmissionCancelled(ticket.session_id)
+                if self.timeout is not None and waited > self.timeout:
+                    self.timeouts += 1
+                    if self.registry is not None:
+                        self.registry.inc(self.TIMEOUT_METRIC)
+                    raise AdmissionTimeout(
+                        f"No BigQuery slot after {waited:.0f}s "
+                        f"({self._running} running, limit {self.max_concurrent})"
+                    )
+                position = self._position(ticket)
+
+            # Outside the lock: the callback may draw Streamlit elements
+            if on_wait is not None:
+                on_wait(position, waited)
+
+            with self._cond:
+                if not ticket.admitted:
+                    self._cond.wait(self.poll_interval)
+
+        if self.registry is not None:
+            self.registry.observe(self.WAIT_METRIC, waited)
+
+    def _abandon(self, ticket: _Ticket):
+        with self._cond:
+            if ticket.admitted:
+                self._running -= 1
+                self._dispatch()
+                return
+            queue = self._queues.get(ticket.session_id)
+            if queue is not None and ticket in queue:
+                queue.remove(ticket)
+                if not queue:
+                    del self._queues[ticket.session_id]
+                    self._order.remove(ticket.session_id)
+            self._export()
+
+    def _grant(self, ticket: _Ticket):
+        ticket.admitted = True
+        self._running += 1
+        self.admitted += 1
+
+    def _dispatch(self):
+        # Caller holds the lock. One ticket per session per round, so a session
+        # with many queued statements can't starve the others.
+        while self._running < self.max_concurrent and self._order:
+            session_id = self._order.popleft()
+            queue = self._queues[session_id]
+            self._grant(queue.popleft())
+            if queue:
+                self._order.append(session_id)
+            else:
+                del self._queues[session_id]
+        self._export()
+        self._cond.notify_all()
+
+    def _position(self, ticket: _Ticket) -> int:
+        # 1-based place in the round-robin dispatch order
+        index = self._queues[ticket.session_id].index(ticket)
+        rank = self._order.index(ticket.session_id)
+        position = index + 1
+        for i, session_id in enumerate(self._order):
+            if session_id == ticket.session_id:
+                continue
+            turns = index + 1 if i < rank else index
+            position += min(len(self._queues[session_id]), turns)
+        return position
+
+    def _export(self):
+        if self.registry is None:
+            return
+        self.registry.set(self.QUEUE_METRIC, sum(len(q) for q in self._queues.values()))
+        self.registry.set(self.RUNNING_METRIC, self._running)
@@ -0,0 +1,90 @@
+import pandas as pd
+import pyarrow as pa
+
+try:
+    from google.cloud import bigquery_storage  # noqa: F401
+    BQ_STORAGE_AVAILABLE = True
+except ImportError:
+    BQ_STORAGE_AVAILABLE = False
+
+
+# ---------------------------------------------------------
+# Fetch (Storage Read API first, REST pager fallback)
+# ---------------------------------------------------------
+def rows_to_arrow(rows) -> pa.Table:
+    if BQ_STORAGE_AVAILABLE:
+        try:
+            return rows.to_arrow(create_bqstorage_client=True)
+        except Exception:
+            # Read API not enabled / no readsessions permission: fall back to REST
+            pass
+    return rows.to_arrow(create_bqstorage_client=False)
+
+
+# ---------------------------------------------------------
+# Pandas Views
+# ---------------------------------------------------------
+def _chart_safe_type(arrow_type):
+    # Vega-Lite can't serialize Decimal / date / time objects
+    if pa.types.is_decimal(arrow_type):
+        return pa.float64()
+    if pa.types.is_date(arrow_type):
+        return pa.timestamp("ms")
+    if pa.types.is_time(arrow_type):
+        return pa.string()
+    return None
+
+
+def arrow_to_pandas(table: pa.Table) -> pd.DataFrame:
+    # ArrowDtype columns wrap the existing buffers, so only the
+    # few columns that need a cast are copied. Dictionary columns
+    # become pandas categoricals.
+    for i, field in enumerate(table.schema):
+        target = _chart_safe_type(field.type)
+        if target is not None:
+            table = table.set_column(i, field.name, table.column(i).cast(target))
+    return table.to_pandas(types_mapper=_pandas_type)
+
+
+def _pandas_type(arrow_type):
+    if pa.types.is_dictionary(arrow_type):
+        return None
+    return pd.ArrowDtype(arrow_type)
+
+
+def table_is_empty(table) -> bool:
+    return table is None or table.num_rows == 0
+
+
+# ---------------------------------------------------------
+# Streaming Budget (row / byte caps)
+# ---------------------------------------------------------
+class ResultBudget:
+    def __init__(self, max_rows: int, max_bytes: int):
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.rows = 0
+        self.bytes = 0
+        self.truncated = False
+
+    @property
+    def exhausted(self) -> bool:
+        return self.rows >= self.max_rows or self.bytes >= self.max_bytes
+
+    def clip(self, batch: pa.RecordBatch):
+        if self.exhausted:
+            self.truncated = True
+            return None
+
+        keep = min(batch.num_rows, self.max_rows - self.rows)
+        if batch.num_rows and batch.nbytes:
+            row_bytes = batch.nbytes / batch.num_rows
+            keep = min(keep, max(1, int((self.max_bytes - self.bytes) / row_bytes)))
+
+        if keep < batch.num_rows:
+            batch = batch.slice(0, keep)
+            self.truncated = True
+
+        self.rows += batch.num_rows
+        self.bytes += batch.nbytes
+        return batch
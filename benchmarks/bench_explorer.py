@@ -0,0 +1,212 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pyarrow as pa
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+APP_PATH = os.path.join(REPO_DIR, "big_query_client_2.py")
+
+SCENARIOS = ["cold_load", "submit_query", "warm_rerun", "plot"]
+
+APP_SCRIPT = """
+import sys
+sys.path[:0] = [{repo!r}, {bench!r}]
+
+import streamlit as st
+from fake_bigquery import FakeBigQueryClient
+
+if "client" not in st.session_state:
+    st.session_state.client = FakeBigQueryClient(rows={rows}, columns={columns}, latency={latency})
+
+with open({app!r}) as f:
+    exec(compile(f.read(), {app!r}, "exec"), {{"__name__": "__main__", "__file__": {app!r}}})
+"""
+
+
+# ---------------------------------------------------------
+# One pass through the explorer (fresh caches, fresh session)
+# ---------------------------------------------------------
+def run_pass(rows: int, columns: int, latency: float, chart_type: str, trace_memory: bool) -> dict:
+    # Every pass starts cold: no st.cache_* entries, no on-disk caches
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    workdir = tempfile.mkdtemp(prefix="bench_explorer_")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+
+    script = APP_SCRIPT.format(
+        repo=REPO_DIR, bench=BENCH_DIR, app=APP_PATH, rows=rows, columns=columns, latency=latency
+    )
+    at = AppTest.from_string(script, default_timeout=600)
+    results = {}
+
+    def step(name, action):
+        if trace_memory:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        action()
+        elapsed = time.perf_counter() - started
+
+        if at.exception:
+            raise RuntimeError(f"{name}: {at.exception[0].value}")
+
+        results[name] = {"seconds": elapsed}
+        if trace_memory:
+            # Growth above what was already live when the step started
+            results[name]["peak_python_mb"] = (tracemalloc.get_traced_memory()[1] - before) / 1e6
+            results[name]["arrow_allocated_mb"] = pa.total_allocated_bytes() / 1e6
+
+    try:
+        step("cold_load", at.run)
+
+        at.text_area(key="main_query_text").set_value(
+            "SELECT * FROM `bench-project.dataset_000.table_000`"
+        )
+        step("submit_query", at.button(key="submit_main").click().run)
+
+        step("warm_rerun", at.run)
+
+        at.selectbox(key="chart_x").set_value("ts" if chart_type == "Line" else "c0")
+        at.selectbox(key="chart_y").set_value("c1" if columns > 1 else "c0")
+        at.radio(key="chart_type_selected").set_value(chart_type)
+        step("plot", at.button(key="chart_builder_plot_btn").click().run)
+
+        charts = at.get("arrow_vega_lite_chart")
+        results["plot"]["chart_bytes"] = charts[0].proto.ByteSize() if charts else 0
+    finally:
+        os.chdir(cwd)
+
+    return results
+
+
+def run_size(rows: int, columns: int, latency: float, chart_type: str, repeats: int) -> list:
+    timings = [run_pass(rows, columns, latency, chart_type, trace_memory=False) for _ in range(repeats)]
+
+    # Memory in a separate pass: tracemalloc slows Python down and would skew timings
+    tracemalloc.start()
+    try:
+        memory = run_pass(rows, columns, latency, chart_type, trace_memory=True)
+    finally:
+        tracemalloc.stop()
+
+    records = []
+    for scenario in SCENARIOS:
+        seconds = [t[scenario]["seconds"] for t in timings]
+        records.append({
+            "rows": rows,
+            "columns": columns,
+            "chart": chart_type,
+            "scenario": scenario,
+            "median_s": statistics.median(seconds),
+            "min_s": min(seconds),
+            "peak_python_mb": memory[scenario]["peak_python_mb"],
+            "arrow_allocated_mb": memory[scenario]["arrow_allocated_mb"],
+            "chart_bytes": timings[-1][scenario].get("chart_bytes"),
+        })
+    return records
+
+
+# ---------------------------------------------------------
+# Reporting / Baseline Comparison
+# ---------------------------------------------------------
+def record_key(record: dict) -> tuple:
+    return (record["rows"], record["columns"], record["chart"], record["scenario"])
+
+
+def print_report(records: list, baseline: dict = None):
+    header = f"{'rows':>9} {'chart':<7} {'scenario':<13} {'median s':>9} {'peak py MB':>11} {'arrow MB':>9} {'chart KB':>9}"
+    if baseline:
+        header += f" {'vs base':>8}"
+    print(header)
+
+    for r in records:
+        chart_kb = f"{r['chart_bytes'] / 1024:,.1f}" if r["chart_bytes"] else "-"
+        line = (
+            f"{r['rows']:>9,} {r['chart']:<7} {r['scenario']:<13} {r['median_s']:>9.3f} "
+            f"{r['peak_python_mb']:>11.1f} {r['arrow_allocated_mb']:>9.1f} {chart_kb:>9}"
+        )
+        base = (baseline or {}).get(record_key(r))
+        if base:
+            line += f" {r['median_s'] / base['median_s'] - 1:>+8.0%}"
+        print(line)
+
+
+def regressions(records: list, baseline: dict, threshold: float) -> list:
+    found = []
+    for r in records:
+        base = baseline.get(record_key(r))
+        if not base:
+            continue
+        for metric in ("median_s", "peak_python_mb", "chart_bytes"):
+            old, new = base.get(metric), r.get(metric)
+            if old and new and new > old * (1 + threshold):
+                found.append(f"{r['scenario']} @ {r['rows']:,} rows ({r['chart']}): {metric} {old:,.3f} -> {new:,.3f}")
+    return found
+
+
+def load_baseline(path: str) -> dict:
+    with open(path) as f:
+        return {record_key(r): r for r in json.load(f)["results"]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the BigQuery explorer (fake client, AppTest).")
+    parser.add_argument("--rows", default="1000,10000,100000", help="comma-separated result sizes")
+    parser.add_argument("--columns", type=int, default=4, help="numeric columns per result")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds injected per BigQuery API call")
+    parser.add_argument("--charts", default="Scatter,Line", help="comma-separated chart types to plot")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--save", help="write results as JSON (e.g. benchmarks/results/latest.json)")
+    parser.add_argument("--baseline", help="JSON file from a previous --save to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative slowdown that counts as a regression")
+    args = parser.parse_args(argv)
+
+    # Imports and first-render costs land here, not in the first measured size
+    run_pass(100, args.columns, 0.0, "Scatter", trace_memory=False)
+
+    records = []
+    for rows in [int(r) for r in args.rows.split(",")]:
+        for chart_type in args.charts.split(","):
+            records.extend(run_size(rows, args.columns, args.latency, chart_type, args.repeats))
+
+    baseline = load_baseline(args.baseline) if args.baseline else None
+    print_report(records, baseline)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w") as f:
+            json.dump(
+                {
+                    "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "python": platform.python_version(),
+                    "streamlit": st.__version__,
+                    "pyarrow": pa.__version__,
+                    "args": vars(args),
+                    "results": records,
+                },
+                f,
+                indent=2,
+            )
+
+    if baseline:
+        found = regressions(records, baseline, args.threshold)
+        for line in found:
+            print(f"REGRESSION {line}")
+        return 1 if found else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+import datetime
+import re
+import time
+import types
+import uuid
+
+import numpy as np
+import pyarrow as pa
+
+
+PROJECT = "bench-project"
+CATEGORIES = ["alpha", "beta", "gamma", "delta", "epsilon", "zeta", "eta", "theta"]
+
+
+def synthetic_table(rows: int, columns: int, seed: int = 0) -> pa.Table:
+    # ts, category, then float columns c0..c{n-1}
+    rng = np.random.default_rng(seed)
+    start = np.datetime64("2024-01-01T00:00:00", "s")
+    data = {
+        "ts": pa.array(start + np.arange(rows) * np.timedelta64(60, "s"), pa.timestamp("us", tz="UTC")),
+        "category": pa.array(rng.choice(CATEGORIES, rows)),
+    }
+    for i in range(columns):
+        data[f"c{i}"] = pa.array(rng.normal(size=rows).cumsum())
+    return pa.table(data)
+
+
+# ---------------------------------------------------------
+# Result / Job Stand-ins
+# ---------------------------------------------------------
+class FakeRowIterator:
+    def __init__(self, table: pa.Table, page_size: int = None):
+        self.table = table
+        self.page_size = page_size or 10_000
+        self.total_rows = table.num_rows
+
+    def to_arrow(self, **kwargs) -> pa.Table:
+        return self.table
+
+    def to_arrow_iterable(self, **kwargs):
+        yield from self.table.to_batches(max_chunksize=self.page_size)
+
+    def to_dataframe(self, **kwargs):
+        return self.table.to_pandas()
+
+    def __iter__(self):
+        return iter(self.table.to_pylist())
+
+
+class FakeQueryJob:
+    def __init__(self, client, query: str, job_config=None):
+        self._client = client
+        self.query = query
+        self.job_id = f"bench_{uuid.uuid4().hex[:12]}"
+        self.state = "DONE"
+        self.total_bytes_processed = client.bytes_per_query
+        self.referenced_tables = [
+            types.SimpleNamespace(project=PROJECT, dataset_id=d, table_id=t)
+            for d, t in client.referenced_tables(query)
+        ]
+
+    def result(self, **kwargs):
+        return self._client.query_and_wait(self.query)
+
+    def done(self, **kwargs):
+        return True
+
+    def reload(self, **kwargs):
+        self._client.sleep()
+
+    def cancel(self, **kwargs):
+        return True
+
+
+# ---------------------------------------------------------
+# Fake bigquery.Client (synthetic data, injected latency)
+# ---------------------------------------------------------
+class FakeBigQueryClient:
+    TABLE_REF = re.compile(r"`?[\w-]+\.(\w+)\.(\w+)`?")
+
+    def __init__(
+        self,
+        rows: int = 1_000,
+        columns: int = 4,
+        latency: float = 0.0,
+        datasets: int = 20,
+        tables_per_dataset: int = 10,
+    ):
+        self.project = PROJECT
+        self.rows = rows
+        self.columns = columns
+        self.latency = latency
+        self.datasets = [f"dataset_{i:03d}" for i in range(datasets)]
+        self.tables = [f"table_{i:03d}" for i in range(tables_per_dataset)]
+        self.calls = {}
+        self._result = synthetic_table(rows, columns)
+
+    @property
+    def bytes_per_query(self) -> int:
+        return self._result.nbytes
+
+    def sleep(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def referenced_tables(self, query: str) -> list:
+        return [m.groups() for m in self.TABLE_REF.finditer(query) if "INFORMATION_SCHEMA" not in m.group(0)]
+
+    def _count(self, name: str):
+        self.calls[name] = self.calls.get(name, 0) + 1
+        self.sleep()
+
+    # -----------------------------
+    # bigquery.Client surface used by the explorer
+    # -----------------------------
+    def list_datasets(self, project=None, **kwargs):
+        self._count("list_datasets")
+        return [types.SimpleNamespace(dataset_id=d) for d in self.datasets]
+
+    def list_tables(self, dataset, **kwargs):
+        self._count("list_tables")
+        return [types.SimpleNamespace(table_id=t, description=None) for t in self.tables]
+
+    def get_table(self, ref):
+        self._count("get_table")
+        project, dataset_id, table_id = str(ref).split(".")
+        return types.SimpleNamespace(
+            project=project,
+            dataset_id=dataset_id,
+            table_id=table_id,
+            schema=[
+                types.SimpleNamespace(name=f.name, field_type=_field_type(f.type), mode="NULLABLE")
+                for f in self._result.schema
+            ],
+            num_rows=self.rows,
+            modified=datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc),
+            description="",
+            streaming_buffer=None,
+            time_partitioning=None,
+            range_partitioning=None,
+        )
+
+    def list_rows(self, table, selected_fields=None, max_results=None, **kwargs):
+        self._count("list_rows")
+        result = self._result.slice(0, max_results)
+        if selected_fields:
+            result = result.select([f.name for f in selected_fields])
+        return FakeRowIterator(result)
+
+    def query(self, query: str, job_config=None, **kwargs):
+        self._count("query")
+        return FakeQueryJob(self, query, job_config)
+
+    def query_and_wait(self, query: str, job_config=None, page_size=None, **kwargs):
+        self._count("query_and_wait")
+        if "INFORMATION_SCHEMA.COLUMNS" in query:
+            return FakeRowIterator(self._columns_table())
+        if "INFORMATION_SCHEMA" in query:
+            return FakeRowIterator(pa.table({"partition_id": pa.array([], pa.string())}))
+        return FakeRowIterator(self._result, page_size)
+
+    def _columns_table(self) -> pa.Table:
+        rows = [
+            {
+                "table_name": table,
+                "column_name": field.name,
+                "ordinal_position": i + 1,
+                "data_type": _field_type(field.type),
+                "is_nullable": "YES",
+                "description": None,
+            }
+            for table in self.tables
+            for i, field in enumerate(self._result.schema)
+        ]
+        return pa.Table.from_pylist(rows)
+
+
+def _field_type(arrow_type) -> str:
+    if pa.types.is_timestamp(arrow_type):
+        return "TIMESTAMP"
+    if pa.types.is_floating(arrow_type):
+        return "FLOAT64"
+    return "STRING"
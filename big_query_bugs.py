@@ -4,6 +4,14 @@ import pandas as pd
 from google.cloud import bigquery
 from google.oauth2 import service_account
 import json
+import os
+import pyarrow as pa
+from result_cache import ResultCache
+
+
+RESULT_CACHE_DIR = os.path.join(".cache", "query_results")
+RESULT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+RESULT_CACHE_TTL_SECONDS = 6 * 60 * 60
 
 
 # ---------------------------------------------------------
@@ -20,6 +28,18 @@ def get_dynamic_client(user_json: str):
         return None
 
 
+# ---------------------------------------------------------
+# Persistent Result Cache (survives restarts)
+# ---------------------------------------------------------
+@st.cache_resource
+def get_result_cache():
+    return ResultCache(
+        RESULT_CACHE_DIR,
+        max_bytes=RESULT_CACHE_MAX_BYTES,
+        default_ttl=RESULT_CACHE_TTL_SECONDS,
+    )
+
+
 # ---------------------------------------------------------
 # Run Query (Graceful Error Handling)
 # ---------------------------------------------------------
@@ -29,8 +49,17 @@ def run_query(query: str):
         client = st.session_state.client
         if client is None:
             return None, "No BigQuery client available."
+
+        cache = get_result_cache()
+        cache_key = cache.key_for(query, client.project)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached.to_pandas(), None
+
         rows = client.query_and_wait(query)
-        return rows.to_dataframe(), None
+        df = rows.to_dataframe()
+        cache.put(cache_key, pa.Table.from_pandas(df, preserve_index=False))
+        return df, None
     except Exception as e:
         safe_bigquery_error(e, context="Running SQL query")
         return None, str(e)
@@ -273,6 +302,12 @@ def build_sidebar_chart_builder():
         key="save_key_btn"
     )
 
+    cache_stats = get_result_cache().stats()
+    st.sidebar.caption(
+        f"Result cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses, "
+        f"{cache_stats['entries']} entries ({cache_stats['bytes'] / 1e6:.1f} MB)"
+    )
+
     df = st.session_state.initial_df
 
     if df is None or df.empty:
@@ -1,69 +1,791 @@
 import streamlit as st
 from st_copy import copy_button
+import numpy as np
 import pandas as pd
 from google.cloud import bigquery
-from google.oauth2 import service_account
+import contextlib
+import contextvars
+import functools
 import json
+import os
+import re
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+import pyarrow as pa
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from admission import AdmissionController
+from arrow_results import ResultBudget, arrow_to_pandas, rows_to_arrow, table_is_empty
+from catalog_search import CatalogSearchIndex
+from client_pool import ClientPool, credential_identity
+from column_profile import ColumnProfile
+from compaction import compact_table, compaction_report
+from downsample import bin2d, lttb_indices, m4_indices
+import local_engine
+from incremental import IncrementalRefresher
+from local_engine import LOCAL_TABLE, LocalEngine
+from memory_governor import MemoryGovernor, SessionLease
+from metadata_catalog import MetadataCatalog
+from pushdown import AGGREGATIONS, TIME_BUCKETS, build_aggregate_query
+from result_grid import GridIndexCache, page, view_indices
+from query_jobs import QueryJobRunner
+from result_cache import ResultCache, normalize_sql, split_statements
+from shared_results import SharedResult, SharedResultStore
+from single_flight import SingleFlight
+from tracing import MetricsServer, Tracer
+
+
+CLIENT_POOL_MAX_SIZE = 16
+CLIENT_POOL_IDLE_SECONDS = 30 * 60
+TOKEN_REFRESH_MARGIN_SECONDS = 5 * 60
+
+RESULT_CACHE_DIR = os.path.join(".cache", "query_results")
+RESULT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+RESULT_CACHE_TTL_SECONDS = 6 * 60 * 60
+
+SHARED_RESULTS_DIR = os.environ.get("EXPLORER_SHARED_RESULTS_DIR", os.path.join(".cache", "shared_results"))
+SHARED_RESULTS_MAX_BYTES = 4 * 1024 * 1024 * 1024
+SHARED_RESULTS_IDLE_SECONDS = 30 * 60
+
+MEMORY_SPILL_DIR = os.path.join(".cache", "spill")
+MEMORY_PROCESS_BUDGET_BYTES = 1024 * 1024 * 1024
+MEMORY_SESSION_BUDGET_BYTES = 256 * 1024 * 1024
+MEMORY_LARGE_RESULT_BYTES = 64 * 1024 * 1024
+
+METRICS_HOST = os.environ.get("EXPLORER_METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.environ.get("EXPLORER_METRICS_PORT", "9464"))
+
+PUBLIC_PROJECT = "bigquery-public-data"
+CATALOG_PATH = os.path.join(".cache", "catalog.sqlite")
+CATALOG_TTL_SECONDS = 24 * 60 * 60
+SEARCH_TOP_N = 50
+
+DEFAULT_CHART_POINT_BUDGET = 5_000
+LINE_DOWNSAMPLE_METHODS = ["LTTB", "M4"]
+PROFILE_CACHE_ENTRIES = 32
+PUSHDOWN_MAX_GROUPS = 5_000
+
+GRID_PAGE_SIZES = [25, 50, 100, 250]
+GRID_INDEX_CACHE_BYTES = 256 * 1024 * 1024
+
+STREAM_PAGE_ROWS = 10_000
+STREAM_DEFAULT_MAX_ROWS = 500_000
+STREAM_DEFAULT_MAX_MB = 256
+STREAM_RENDER_INTERVAL_SECONDS = 0.5
+
+RUN_MODES = ["Standard", "Stream", "Background", "Batch", "Incremental"]
+BATCH_MAX_CONCURRENCY = 4
+READ_ONLY_STATEMENT = re.compile(r"^\s*(\(\s*)*(SELECT|WITH)\b", re.IGNORECASE)
+JOB_WORKERS = 8
+MAX_INFLIGHT_JOBS_PER_SESSION = 2
+JOB_POLL_SECONDS = 2
+
+ADMISSION_MAX_CONCURRENT = int(os.environ.get("EXPLORER_MAX_CONCURRENT_QUERIES", "8"))
+ADMISSION_QUEUE_TIMEOUT_SECONDS = 5 * 60
+
+DRY_RUN_CACHE_TTL_SECONDS = 60 * 60
+
+PREVIEW_ROWS = 20
+PREVIEW_DEFAULT_COLUMNS = 10
+PREVIEW_CACHE_TTL_SECONDS = 10 * 60
+PREVIEW_CACHE_ENTRIES = 64
+UNLISTABLE_TABLE_TYPES = ("VIEW", "MATERIALIZED_VIEW", "EXTERNAL")
+DEFAULT_CONFIRM_GB = 10
+DEFAULT_MAX_GB_BILLED = 100
 
 
 # ---------------------------------------------------------
 # BigQuery Client
 # ---------------------------------------------------------
 @st.cache_resource
+def get_client_pool():
+    return ClientPool(
+        max_size=CLIENT_POOL_MAX_SIZE,
+        idle_ttl=CLIENT_POOL_IDLE_SECONDS,
+        refresh_margin=TOKEN_REFRESH_MARGIN_SECONDS,
+    )
+
+
 def get_dynamic_client(user_json: str):
     try:
         key_dict = json.loads(user_json)
-        credentials = service_account.Credentials.from_service_account_info(key_dict)
-        return bigquery.Client(credentials=credentials, project=credentials.project_id)
+        client = get_client_pool().get(key_dict)
+        st.session_state.client_identity = credential_identity(key_dict)
+        return client
     except Exception as e:
         st.error(f"Invalid credentials: {e}")
         return None
 
 
+def refresh_session_client():
+    # Keeps the pooled entry warm (idle eviction, token refresh)
+    identity = st.session_state.client_identity
+    if not identity:
+        return
+    client = get_client_pool().touch(identity)
+    if client is not None:
+        st.session_state.client = client
+
+
+
+
+# ---------------------------------------------------------
+# Persistent Result Cache (survives restarts)
+# ---------------------------------------------------------
+@st.cache_resource
+def get_result_cache():
+    return ResultCache(
+        RESULT_CACHE_DIR,
+        max_bytes=RESULT_CACHE_MAX_BYTES,
+        default_ttl=RESULT_CACHE_TTL_SECONDS,
+    )
+
+
+# ---------------------------------------------------------
+# Shared Results (one mapped copy per host, across sessions and processes)
+# ---------------------------------------------------------
+@st.cache_resource
+def get_shared_results():
+    return SharedResultStore(
+        SHARED_RESULTS_DIR,
+        max_bytes=SHARED_RESULTS_MAX_BYTES,
+        ttl=RESULT_CACHE_TTL_SECONDS,
+        idle_ttl=SHARED_RESULTS_IDLE_SECONDS,
+    )
+
+
+@st.cache_resource
+def get_query_flights():
+    # Identical queries in flight at the same time share one BigQuery job
+    return SingleFlight()
+
+
+# ---------------------------------------------------------
+# Tracing (per-rerun spans, Prometheus / OTLP endpoint)
+# ---------------------------------------------------------
+@st.cache_resource
+def get_tracer():
+    return Tracer()
+
+
+@st.cache_resource
+def get_metrics_server():
+    # /metrics (Prometheus text) and /traces (OTLP JSON); one per process
+    try:
+        return MetricsServer(get_tracer(), METRICS_HOST, METRICS_PORT)
+    except OSError:
+        return None
+
+
+def traced(stage: str, **attributes):
+    return get_tracer().span(stage, **attributes)
+
+
+# ---------------------------------------------------------
+# Admission Control (process-wide BigQuery job limit, fair across sessions)
+# ---------------------------------------------------------
+@st.cache_resource
+def get_admission():
+    return AdmissionController(
+        ADMISSION_MAX_CONCURRENT,
+        registry=get_tracer().registry,
+        timeout=ADMISSION_QUEUE_TIMEOUT_SECONDS,
+    )
+
+
+@contextlib.contextmanager
+def query_slot(admission, session_id: str, notify: bool = False, cancelled=None):
+    # notify draws the queue position, so only from the script thread
+    placeholder = []
+
+    def on_wait(position, waited):
+        if not placeholder:
+            placeholder.append(st.empty())
+        placeholder[0].info(f"Waiting for a BigQuery slot: position {position} in the queue ({waited:.0f}s)")
+
+    with admission.admit(session_id, on_wait=on_wait if notify else None, cancelled=cancelled):
+        if placeholder:
+            placeholder[0].empty()
+        yield
+
+
+# ---------------------------------------------------------
+# Memory Governor (session results, spilled to disk when cold)
+# ---------------------------------------------------------
+@st.cache_resource
+def get_memory_governor():
+    return MemoryGovernor(
+        MEMORY_SPILL_DIR,
+        process_budget=MEMORY_PROCESS_BUDGET_BYTES,
+        session_budget=MEMORY_SESSION_BUDGET_BYTES,
+        large_result_bytes=MEMORY_LARGE_RESULT_BYTES,
+    )
+
+
+def current_session_id() -> str:
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx else "local"
+
+
+def put_session_table(key: str, table, lease=None):
+    get_memory_governor().put(current_session_id(), key, table, lease=lease)
+
+
+def get_session_table(key: str):
+    return get_memory_governor().get(current_session_id(), key)
+
+
+def get_result_table():
+    return get_session_table("result")
 
 
 # ---------------------------------------------------------
 # Run Query (Graceful Error Handling)
 # ---------------------------------------------------------
-@st.cache_data(show_spinner=False)
-def run_query(query: str):
+def query_job_config(max_bytes_billed: int = None):
+    if not max_bytes_billed:
+        return None
+    return bigquery.QueryJobConfig(maximum_bytes_billed=int(max_bytes_billed))
+
+
+def execute_query(client, cache, tracer, query: str, max_bytes_billed: int = None, slot=None):
+    # No Streamlit calls of its own: also used from worker threads
+    cache_key = cache.key_for(query, client.project)
+    with tracer.span("result_cache_get"):
+        cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # The admission slot covers the job and the download, not cache hits
+    with slot or contextlib.nullcontext():
+        with tracer.span("query"):
+            rows = client.query_and_wait(query, job_config=query_job_config(max_bytes_billed))
+        with tracer.span("to_arrow") as span:
+            table = rows_to_arrow(rows)
+            span.attributes["rows"] = table.num_rows
+    with tracer.span("compact"):
+        table = compact_table(table)
+    with tracer.span("result_cache_put"):
+        cache.put(cache_key, table)
+    return table
+
+
+def execute_shared_query(
+    client, cache, shared, flights, tracer, query: str, max_bytes_billed: int = None, identity=None, slot=None
+):
+    # Published once per host; every later session / process maps the same file
+    key = cache.key_for(query, client.project)
+    with tracer.span("shared_acquire"):
+        result = shared.acquire(key)
+    if result is not None:
+        return result
+
+    def run():
+        table = execute_query(client, cache, tracer, query, max_bytes_billed, slot=slot)
+        with tracer.span("shared_publish"):
+            return shared.publish(key, table)
+
+    # key covers project + normalized SQL; the job also depends on who runs it and its byte cap
+    with tracer.span("single_flight") as span:
+        result, leader = flights.do((identity, key, max_bytes_billed), run)
+        span.attributes["leader"] = leader
+    if leader:
+        return result
+
+    # Followers take their own lease on the leader's result
+    return shared.acquire(key) or SharedResult(None, key, result.table)
+
+
+# Returns a SharedResult: whoever keeps the table keeps (and later releases) the lease
+def run_query(query: str, max_bytes_billed: int = None):
     try:
         client = st.session_state.client
-        rows = client.query_and_wait(query)
-        return rows.to_dataframe(), None
+        return execute_shared_query(
+            client,
+            get_result_cache(),
+            get_shared_results(),
+            get_query_flights(),
+            get_tracer(),
+            query,
+            max_bytes_billed,
+            identity=st.session_state.client_identity,
+            slot=query_slot(get_admission(), current_session_id(), notify=True),
+        ), None
     except Exception as e:
         safe_bigquery_error(e, context="Running SQL query")
         return None, str(e)
 
 
 # ---------------------------------------------------------
-# Helpers
+# Run Query (Streaming, page by page)
+# ---------------------------------------------------------
+def run_query_pages(query: str, budget: ResultBudget, max_bytes_billed: int = None):
+    client = st.session_state.client
+
+    cache = get_result_cache()
+    cache_key = cache.key_for(query, client.project)
+    cached = cache.get(cache_key)
+
+    slot = contextlib.nullcontext()
+    if cached is None:
+        slot = query_slot(get_admission(), current_session_id(), notify=True)
+
+    fetched = []
+    with slot:
+        if cached is not None:
+            batches = cached.to_batches(max_chunksize=STREAM_PAGE_ROWS)
+        else:
+            with traced("query", mode="stream"):
+                rows = client.query_and_wait(
+                    query,
+                    job_config=query_job_config(max_bytes_billed),
+                    page_size=STREAM_PAGE_ROWS,
+                )
+            batches = rows.to_arrow_iterable()
+
+        for batch in batches:
+            batch = budget.clip(batch)
+            if batch is None:
+                break
+            fetched.append(batch)
+            yield batch
+
+    # Only complete results are worth persisting
+    if cached is None and not budget.truncated and fetched:
+        cache.put(cache_key, compact_table(pa.Table.from_batches(fetched)))
+
+
+# ---------------------------------------------------------
+# Run Query (Background Jobs)
+# ---------------------------------------------------------
+@st.cache_resource
+def get_job_runner():
+    return QueryJobRunner(max_workers=JOB_WORKERS)
+
+
+def submit_background_query(query: str, max_bytes_billed: int = None):
+    client = st.session_state.client
+
+    cache = get_result_cache()
+    shared = get_shared_results()
+    cache_key = cache.key_for(query, client.project)
+    lease = shared.acquire(cache_key)
+    if lease is None:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            lease = shared.publish(cache_key, cached)
+    if lease is not None:
+        store_query_result(lease.table, query=query, lease=lease)
+        return
+
+    tracer = get_tracer()
+
+    # Returns a SharedResult, like run_query; the job monitor stores it
+    def fetch(rows):
+        with tracer.span("to_arrow", mode="background"):
+            table = rows_to_arrow(rows)
+        with tracer.span("compact", mode="background"):
+            table = compact_table(table)
+        cache.put(cache_key, table)
+        with tracer.span("shared_publish", mode="background"):
+            return shared.publish(cache_key, table)
+
+    # Admitted on the worker: the job is only inserted once it has a slot
+    admission = get_admission()
+    session_id = current_session_id()
+    handle = get_job_runner().submit(
+        client, query, fetch,
+        job_config=query_job_config(max_bytes_billed),
+        slot=lambda cancelled: query_slot(admission, session_id, cancelled=cancelled),
+    )
+    st.session_state.query_jobs.append(handle)
+    st.session_state.results_version += 1
+
+
+def inflight_jobs():
+    return [h for h in st.session_state.query_jobs if not h.done]
+
+
+# ---------------------------------------------------------
+# Run Query (Batch: statements side by side)
+# ---------------------------------------------------------
+def run_batch(statements: list, max_bytes_billed: int = None) -> list:
+    client = st.session_state.client
+    cache = get_result_cache()
+    shared = get_shared_results()
+    flights = get_query_flights()
+    tracer = get_tracer()
+    identity = st.session_state.client_identity
+    admission = get_admission()
+    session_id = current_session_id()
+
+    def run_one(index, sql):
+        started = time.monotonic()
+        try:
+            with tracer.span("batch_statement", index=index):
+                result = execute_shared_query(
+                    client, cache, shared, flights, tracer, sql, max_bytes_billed,
+                    identity=identity, slot=query_slot(admission, session_id),
+                )
+                error = None
+        except Exception as e:
+            result, error = None, str(e)
+        return {"sql": sql, "shared": result, "error": error, "seconds": time.monotonic() - started}
+
+    workers = min(BATCH_MAX_CONCURRENCY, len(statements))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bq-batch") as pool:
+        # Each task gets a copy of this rerun's context so its spans join the trace
+        futures = [
+            pool.submit(contextvars.copy_context().run, run_one, i, sql)
+            for i, sql in enumerate(statements)
+        ]
+        return [f.result() for f in futures]
+
+
+def submit_batch(query: str, max_bytes_billed: int = None):
+    statements = split_statements(query)
+
+    # Separate jobs share no script state, so only plain reads can run side by side
+    # (checked without comments: a leading "-- note" is still a SELECT)
+    writes = [s for s in statements if not READ_ONLY_STATEMENT.match(normalize_sql(s))]
+    if writes:
+        st.session_state.query_error = (
+            "Batch mode runs SELECT / WITH statements only. "
+            "Use Standard mode for scripts with DECLARE, SET, DML or DDL."
+        )
+        st.error(st.session_state.query_error)
+        return
+
+    for i in range(len(st.session_state.batch_results or [])):
+        put_session_table(f"batch_{i}", None)
+
+    started = time.monotonic()
+    results = run_batch(statements, max_bytes_billed)
+    st.session_state.batch_seconds = time.monotonic() - started
+
+    # Tables go to the governor; session state keeps the metadata only
+    for i, result in enumerate(results):
+        shared = result.pop("shared")
+        result["rows"] = shared.table.num_rows if shared is not None else 0
+        result["key"] = shared.key if shared is not None else None
+        put_session_table(f"batch_{i}", shared and shared.table, lease=shared)
+    st.session_state.batch_results = results
+    st.session_state.results_version += 1
+
+
+def promote_batch_result(index: int):
+    result = st.session_state.batch_results[index]
+    # A second lease on the same mapping, so the batch tab and the result are independent
+    lease = get_shared_results().acquire(result["key"]) if result.get("key") else None
+    if lease is not None:
+        store_query_result(lease.table, query=result["sql"], lease=lease)
+    else:
+        store_query_result(get_session_table(f"batch_{index}"), query=result["sql"])
+
+
+def render_batch_results():
+    results = st.session_state.batch_results
+    total = sum(r["seconds"] for r in results)
+    st.caption(
+        f"{len(results)} statements in {st.session_state.batch_seconds:.1f}s wall time "
+        f"({total:.1f}s if run one after another)"
+    )
+
+    tabs = st.tabs([f"Query {i + 1}" for i in range(len(results))])
+    for i, (tab, result) in enumerate(zip(tabs, results)):
+        with tab:
+            st.code(result["sql"], language="sql")
+            if result["error"]:
+                st.error(result["error"])
+                continue
+            table = get_session_table(f"batch_{i}")
+            st.caption(
+                " · ".join(
+                    filter(None, [f"{result['rows']:,} rows in {result['seconds']:.1f}s", compaction_caption(table)])
+                )
+            )
+            render_paged_grid(table, f"batch_grid_{i}")
+            st.button(
+                "Use as query result",
+                on_click=promote_batch_result,
+                args=(i,),
+                key=f"promote_batch_{i}"
+            )
+
+
+# ---------------------------------------------------------
+# Run Query (Incremental: only rows past the watermark)
 # ---------------------------------------------------------
+@st.cache_resource
+def get_incremental_refresher():
+    return IncrementalRefresher(get_result_cache())
+
+
+def submit_incremental_query(query: str, max_bytes_billed: int = None):
+    column = (st.session_state.incremental_column or "").strip()
+    if not column:
+        st.session_state.query_error = "Incremental mode needs a watermark column from the query result."
+        st.error(st.session_state.query_error)
+        return
+
+    # Tables the dry run saw; their modified timestamps decide what to refetch
+    estimate = st.session_state.last_estimate or {}
+    try:
+        slot = query_slot(get_admission(), current_session_id(), notify=True)
+        with slot, traced("incremental_refresh"):
+            table, info = get_incremental_refresher().refresh(
+                st.session_state.client,
+                query,
+                column,
+                estimate.get("tables", []),
+                max_bytes_billed,
+                append_only=st.session_state.incremental_append_only,
+            )
+    except Exception as e:
+        st.session_state.query_error = str(e)
+        safe_bigquery_error(e, context="Refreshing incremental query")
+        return
+
+    st.session_state.incremental_info = info
+    store_query_result(table, query=query)
+
+
+def render_incremental_info():
+    info = st.session_state.incremental_info
+    if not info:
+        return
+
+    if info["mode"] == "unchanged":
+        st.caption(f"Source tables unchanged since the last run; served from cache (watermark {info['watermark']}).")
+    elif info["mode"] == "incremental":
+        st.caption(f"Appended {info['new_rows']:,} new rows; watermark now {info['watermark']}.")
+    else:
+        st.caption(f"Full refresh: {info['new_rows']:,} rows, watermark {info['watermark']}.")
+
+
+# ---------------------------------------------------------
+# Dry Run Estimate (bytes scanned, referenced tables)
+# ---------------------------------------------------------
+@st.cache_data(show_spinner=False, ttl=DRY_RUN_CACHE_TTL_SECONDS)
+def dry_run_query(normalized_query: str, project: str):
+    # project is part of the cache key only. Errors raise: st.cache_data
+    # doesn't keep exceptions, so one caller's failure isn't served to others
+    client = st.session_state.client
+    job_config = bigquery.QueryJobConfig(dry_run=True, use_query_cache=False)
+    with traced("dry_run"):
+        job = client.query(normalized_query, job_config=job_config)
+    tables = [
+        f"{t.project}.{t.dataset_id}.{t.table_id}"
+        for t in (job.referenced_tables or [])
+    ]
+    return {"bytes": job.total_bytes_processed or 0, "tables": tables}
+
+
+def estimate_query(query: str):
+    client = st.session_state.client
+    try:
+        return dry_run_query(normalize_sql(query), client.project), None
+    except Exception as e:
+        return None, str(e)
+
+
+def format_bytes(num_bytes) -> str:
+    size = float(num_bytes)
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:,.1f} {unit}"
+        size /= 1024
+    return f"{size:,.1f} TB"
+
+
+def max_bytes_billed_setting() -> int:
+    return int(st.session_state.max_gb_billed * 1024 ** 3)
+
+
+def check_query_cost(query: str) -> bool:
+    estimate, error = estimate_query(query)
+    st.session_state.last_estimate = estimate
+
+    if error:
+        # Syntax errors etc. surface here without spending a job
+        st.session_state.query_error = error
+        st.error("Query failed. Please check your SQL.")
+        return False
+
+    scanned = estimate["bytes"]
+    if scanned > max_bytes_billed_setting():
+        st.session_state.query_error = (
+            f"Query would scan {format_bytes(scanned)}, above the "
+            f"{st.session_state.max_gb_billed:g} GB limit. Filter partitions or select fewer columns."
+        )
+        st.error(st.session_state.query_error)
+        return False
+
+    confirm_bytes = st.session_state.confirm_gb * 1024 ** 3
+    if scanned > confirm_bytes and st.session_state.confirmed_query != normalize_sql(query):
+        st.session_state.pending_confirmation = query
+        return False
+
+    st.session_state.pending_confirmation = None
+    return True
+
+
+def confirm_large_query(selected_dataset):
+    st.session_state.confirmed_query = normalize_sql(st.session_state.pending_confirmation)
+    st.session_state.pending_confirmation = None
+    submit_handler_main(selected_dataset)
+
+
+def render_cost_estimate(selected_dataset):
+    estimate = st.session_state.last_estimate
+    if not estimate:
+        return
+
+    tables = ", ".join(f"`{t}`" for t in estimate["tables"]) or "none"
+    st.caption(f"Estimated scan: {format_bytes(estimate['bytes'])} · Tables: {tables}")
+
+    if st.session_state.pending_confirmation:
+        st.warning(
+            f"This query will scan {format_bytes(estimate['bytes'])}, above the "
+            f"{st.session_state.confirm_gb:g} GB confirmation threshold."
+        )
+        st.button(
+            "Run anyway",
+            on_click=confirm_large_query,
+            args=(selected_dataset,),
+            key="confirm_large_query_btn"
+        )
+
+
+# ---------------------------------------------------------
+# Metadata Catalog (shared by every session in the process)
+# ---------------------------------------------------------
+@st.cache_resource
+def get_catalog():
+    return MetadataCatalog(CATALOG_PATH, ttl=CATALOG_TTL_SECONDS)
+
+
 def get_all_datasets():
-    public_project = "bigquery-public-data"
     if st.session_state.client:
         client = st.session_state.client
-        datasets = list(client.list_datasets(project=public_project))
-        return [d.dataset_id for d in datasets]
+        try:
+            with traced("list_datasets"):
+                return get_catalog().datasets(client, PUBLIC_PROJECT)
+        except Exception as e:
+            safe_bigquery_error(e, context="Listing datasets")
+            return []
 
 
 def get_schema(dataset: str):
-    query = f"""
-        SELECT table_name
-        FROM `bigquery-public-data.{dataset}.INFORMATION_SCHEMA.TABLES`
-    """
+    client = st.session_state.client
+
+    try:
+        with traced("schema_query", dataset=dataset):
+            tables = get_catalog().tables(client, PUBLIC_PROJECT, dataset)
+    except Exception as e:
+        st.session_state.query_error = str(e)
+        safe_bigquery_error(e, context="Loading dataset schema")
+        return pd.DataFrame({"table_id": []})
+
+    return pd.DataFrame({"table_id": tables})
+
+
+def get_dataset_columns(dataset: str) -> dict:
+    # One INFORMATION_SCHEMA.COLUMNS query per dataset, then in-memory lookups
+    client = st.session_state.client
+    try:
+        with traced("columns_query", dataset=dataset):
+            return get_catalog().columns(client, PUBLIC_PROJECT, dataset)
+    except Exception as e:
+        safe_bigquery_error(e, context="Loading column schemas")
+        return {}
+
+
+# ---------------------------------------------------------
+# Catalog Search (trigram index, rebuilt when the catalog changes)
+# ---------------------------------------------------------
+@st.cache_resource(max_entries=1)
+def get_search_index(catalog_version):
+    return CatalogSearchIndex(get_catalog().search_documents(PUBLIC_PROJECT))
 
-    df, error = run_query(query)
 
+def search_catalog(query: str) -> list:
+    catalog = get_catalog()
+
+    if not st.session_state.catalog_warmed:
+        catalog.warm_tables(st.session_state.client, PUBLIC_PROJECT)
+        st.session_state.catalog_warmed = True
+
+    return get_search_index(catalog.version()).search(query, limit=SEARCH_TOP_N)
+
+
+def group_matches(matches: list):
+    # dataset -> matched tables in rank order; None means the dataset itself matched
+    grouped = {}
+    for match in matches:
+        dataset = match["dataset"]
+        if match["kind"] == "dataset":
+            grouped[dataset] = None
+        elif grouped.get(dataset, []) is not None:
+            tables = grouped.setdefault(dataset, [])
+            if match["table"] not in tables:
+                tables.append(match["table"])
+    return grouped
+
+
+# ---------------------------------------------------------
+# Table Preview (row listing API: no query job, nothing billed)
+# ---------------------------------------------------------
+@st.cache_data(show_spinner=False, ttl=PREVIEW_CACHE_TTL_SECONDS, max_entries=PREVIEW_CACHE_ENTRIES)
+def fetch_table_preview(table_ref: str, columns: tuple, project: str):
+    # project is part of the cache key only. API errors raise so they aren't
+    # cached; the (None, reason) returns are properties of the table itself
+    client = st.session_state.client
+    with traced("get_table", table=table_ref):
+        table = client.get_table(table_ref)
+
+    table_type = getattr(table, "table_type", None) or "TABLE"
+    if table_type in UNLISTABLE_TABLE_TYPES:
+        return None, f"{table_type.replace('_', ' ').lower()}s have no stored rows to list"
+
+    fields = [f for f in table.schema if f.name in columns]
+    if not fields:
+        # An empty projection would list every column
+        return None, "the selected columns are no longer in the table schema"
+    with traced("list_rows", table=table_ref, columns=len(fields)):
+        rows = client.list_rows(
+            table, selected_fields=fields, max_results=PREVIEW_ROWS, page_size=PREVIEW_ROWS
+        )
+        # REST pages only: the Storage Read API would be billed
+        return rows.to_arrow(create_bqstorage_client=False), None
+
+
+def render_data_preview(table_ref: str, column_names: list):
+    columns = st.multiselect(
+        "Preview columns",
+        column_names,
+        default=column_names[:PREVIEW_DEFAULT_COLUMNS],
+        key=f"preview_columns_{table_ref}"
+    )
+    if not columns:
+        return
+
+    client = st.session_state.client
+    try:
+        preview, error = fetch_table_preview(table_ref, tuple(columns), client.project)
+    except Exception as e:
+        preview, error = None, str(e)
     if error:
-        st.session_state.query_error = error
-        safe_bigquery_error(error, context="Loading dataset schema")
-        st.error("Query failed. Please check your SQL.")
-        return pd.DataFrame({"table_id": []})
+        st.caption(f"No data preview: {error}")
+        return
+
+    st.dataframe(arrow_to_pandas(preview), use_container_width=True)
+    st.caption(f"First {preview.num_rows:,} rows from the row listing API: no query job, no bytes billed")
 
-    df = df.rename(columns={"table_name": "table_id"})
-    return df
 
+# ---------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------
 def user_key_handler(user_key_json):
     if user_key_json:
         st.session_state["user_key_json"] = user_key_json
@@ -85,29 +807,34 @@ def user_key_handler(user_key_json):
 def show_table_preview(table_id: str):
     st.write(f"**Schema**: `{table_id}`")
 
-    client = st.session_state.client
-
-    table_ref = f"bigquery-public-data.{st.session_state.selected_dataset}.{table_id}"
-    table = client.get_table(table_ref)
+    table_ref = f"{PUBLIC_PROJECT}.{st.session_state.selected_dataset}.{table_id}"
+    schema_rows = get_dataset_columns(st.session_state.selected_dataset).get(table_id)
 
-    schema_rows = [
-        {"name": field.name, "type": field.field_type, "mode": field.mode}
-        for field in table.schema
-    ]
+    if schema_rows is None:
+        # Not in the prefetched index (e.g. created since the last refresh)
+        client = st.session_state.client
+        with traced("get_table", table=table_ref):
+            table = client.get_table(table_ref)
+        schema_rows = [
+            {"name": field.name, "type": field.field_type, "mode": field.mode}
+            for field in table.schema
+        ]
 
-    df_schema = pd.DataFrame(schema_rows)
+    df_schema = pd.DataFrame(schema_rows, columns=["name", "type", "mode"])
 
     st.dataframe(df_schema, use_container_width=True)
 
+    render_data_preview(table_ref, list(df_schema["name"]))
+
 
 # ---------------------------------------------------------
 # Schema Change Detector (ONLY for SQL query results)
 # ---------------------------------------------------------
-def detect_schema_change(df):
-    if df is None or not hasattr(df, "columns"):
+def detect_schema_change(profile):
+    if profile is None:
         return False
 
-    cols = tuple(df.columns.tolist())
+    cols = profile.columns
 
     if "last_schema" not in st.session_state:
         st.session_state.last_schema = cols
@@ -144,7 +871,7 @@ def safe_bigquery_error(error: Exception, context: str = ""):
 # ---------------------------------------------------------
 # Plotting (Scatter, Line, Bar)
 # ---------------------------------------------------------
-def make_scatter_chart(df, x, y, legend_field, x_type, y_type):
+def make_scatter_chart(df, x, y, legend_field, x_type, y_type, size_field=None):
     import altair as alt
     return (
         alt.Chart(df)
@@ -156,7 +883,11 @@ def make_scatter_chart(df, x, y, legend_field, x_type, y_type):
                 alt.Color(legend_field, title="Legend")
                 if legend_field else alt.value("steelblue")
             ),
-            tooltip=[x, y],
+            size=(
+                alt.Size(f"{size_field}:Q", title="Points")
+                if size_field else alt.value(80)
+            ),
+            tooltip=[x, y, size_field] if size_field else [x, y],
         )
     )
 
@@ -194,7 +925,72 @@ def make_bar_chart(df, x, y, legend_field, x_type, y_type):
         )
     )
 
-def plotting_altair(df: pd.DataFrame, x: str, y: str, chart_type: str):
+# ---------------------------------------------------------
+# Downsampling (keeps chart payloads under the point budget)
+# ---------------------------------------------------------
+def is_timestamp_dtype(dtype) -> bool:
+    if isinstance(dtype, pd.ArrowDtype):
+        return pa.types.is_timestamp(dtype.pyarrow_dtype)
+    return pd.api.types.is_datetime64_any_dtype(dtype)
+
+
+def axis_values(series: pd.Series) -> np.ndarray:
+    if is_timestamp_dtype(series.dtype):
+        return series.to_numpy(dtype="datetime64[ns]").astype("int64")
+    return series.to_numpy(dtype="float64")
+
+
+def from_axis_values(values: np.ndarray, like: pd.Series):
+    # Inverse of axis_values for computed positions (bin means)
+    if not is_timestamp_dtype(like.dtype):
+        return values
+    stamps = pd.to_datetime(values.astype("int64"), utc=True)
+    dtype = like.dtype.pyarrow_dtype if isinstance(like.dtype, pd.ArrowDtype) else like.dtype
+    tz = getattr(dtype, "tz", None)
+    return stamps.tz_convert(tz) if tz else stamps.tz_localize(None)
+
+
+def downsample_for_chart(df, x, y, chart_type, x_type, y_type):
+    # Returns (df, size_field, note)
+    budget = int(st.session_state.chart_point_budget)
+    total = len(df)
+
+    if total <= budget or x == y or y_type != "Q":
+        return df, None, None
+
+    if chart_type == "Scatter" and x_type in ("Q", "T"):
+        points = df[[x, y]].dropna()
+        binned = bin2d(axis_values(points[x]), axis_values(points[y]), bins=max(2, int(np.sqrt(budget))))
+        size_field = "points" if "points" not in (x, y) else "_points"
+        out = pd.DataFrame({
+            x: from_axis_values(binned["x"], points[x]),
+            y: binned["y"],
+            size_field: binned["count"],
+        })
+        note = (
+            f"Binned {total:,} points into {len(out):,} cells "
+            f"({total - len(out):,} fewer marks)"
+        )
+        return out, size_field, note
+
+    if chart_type == "Line" and x_type in ("Q", "T"):
+        points = df[[x, y]].dropna().sort_values(x)
+        xs, ys = axis_values(points[x]), axis_values(points[y])
+
+        method = st.session_state.line_downsample_method
+        if method == "M4":
+            idx = m4_indices(xs, ys, n_buckets=max(1, budget // 4))
+        else:
+            idx = lttb_indices(xs, ys, n_out=budget)
+
+        out = points.iloc[idx]
+        note = f"Showing {len(out):,} of {total:,} points ({total - len(out):,} dropped by {method})"
+        return out, None, note
+
+    return df, None, None
+
+
+def plotting_altair(df: pd.DataFrame, x: str, y: str, chart_type: str, profile=None):
     import altair as alt
 
     if df is None or df.empty:
@@ -205,18 +1001,16 @@ def plotting_altair(df: pd.DataFrame, x: str, y: str, chart_type: str):
         st.warning(f"Selected fields are not valid. Columns: {df.columns.tolist()}")
         return
 
-    df = df.copy()
+    if profile is None:
+        profile = ColumnProfile(pa.Table.from_pandas(df, preserve_index=False))
 
-    # Convert numeric-looking strings
-    for col in df.columns:
-        if df[col].dtype == "object":
-            df[col] = pd.to_numeric(df[col], errors="ignore")
+    # Plotted columns only, numeric-looking strings already parsed
+    df = profile.chart_frame(df, [x, y])
 
-    numeric_cols = df.select_dtypes(include=["number"]).columns.tolist()
-    categorical_cols = df.select_dtypes(exclude=["number"]).columns.tolist()
+    categorical_cols = profile.categorical_columns
 
-    x_type = "Q" if x in numeric_cols else "N"
-    y_type = "Q" if y in numeric_cols else "N"
+    x_type = profile.vega_type(x)
+    y_type = profile.vega_type(y)
 
     legend_field = None
     if x in categorical_cols:
@@ -227,9 +1021,12 @@ def plotting_altair(df: pd.DataFrame, x: str, y: str, chart_type: str):
     if legend_field and legend_field not in df.columns:
         legend_field = None
 
+    with traced("downsample", rows=len(df)):
+        df, size_field, downsample_note = downsample_for_chart(df, x, y, chart_type, x_type, y_type)
+
     # --- Choose chart ---
     if chart_type == "Scatter":
-        chart = make_scatter_chart(df, x, y, legend_field, x_type, y_type)
+        chart = make_scatter_chart(df, x, y, legend_field, x_type, y_type, size_field)
     elif chart_type == "Line":
         chart = make_line_chart(df, x, y, legend_field, x_type, y_type)
     elif chart_type == "Bar":
@@ -243,7 +1040,12 @@ def plotting_altair(df: pd.DataFrame, x: str, y: str, chart_type: str):
         title=f"{chart_type} Chart"
     ).interactive()
 
-    st.altair_chart(chart, use_container_width=True, width="stretch", height="content")
+    # Spec + data serialization happens inside altair_chart
+    with traced("altair_chart", points=len(df)):
+        st.altair_chart(chart, use_container_width=True, width="stretch", height="content")
+
+    if downsample_note:
+        st.caption(downsample_note)
 
 
 # ---------------------------------------------------------
@@ -253,34 +1055,234 @@ def submit_handler_main(selected_dataset):
     query = st.session_state.main_query_text
 
     if not query or not query.strip():
-        st.session_state.initial_df = None
         st.session_state.query_error = "Please enter a SQL query."
         return
 
-    df, error = run_query(query)
+    if not check_query_cost(query):
+        return
+
+    max_bytes_billed = max_bytes_billed_setting()
+    run_mode = st.session_state.get("run_mode")
+
+    if run_mode == "Background":
+        if len(inflight_jobs()) >= MAX_INFLIGHT_JOBS_PER_SESSION:
+            st.session_state.query_error = (
+                f"At most {MAX_INFLIGHT_JOBS_PER_SESSION} background queries can run at once. "
+                "Wait for one to finish or cancel it."
+            )
+            st.warning(st.session_state.query_error)
+            return
+        try:
+            submit_background_query(query, max_bytes_billed)
+        except Exception as e:
+            st.session_state.query_error = str(e)
+            safe_bigquery_error(e, context="Submitting background query")
+        return
+
+    if run_mode == "Batch":
+        submit_batch(query, max_bytes_billed)
+        return
+
+    if run_mode == "Incremental":
+        submit_incremental_query(query, max_bytes_billed)
+        return
+
+    # Streaming results are fetched while the result view renders
+    if run_mode == "Stream":
+        st.session_state.pending_stream_query = query
+        st.session_state.pending_stream_max_bytes_billed = max_bytes_billed
+        store_query_result(None)
+        return
 
-    if error or df is None:
-        st.session_state.initial_df = None
+    result, error = run_query(query, max_bytes_billed)
+
+    if error or result is None:
         st.session_state.query_error = error
         st.error("Query failed. Please check your SQL.")
         return
 
-    # Store result
-    st.session_state.initial_df = df
+    store_query_result(result.table, query=query, lease=result)
+
+
+def store_query_result(table, truncated: bool = False, query: str = None, lease=None):
+    # Shared results were compacted before publishing; the rest (stream,
+    # incremental, local) are compacted here, before the governor counts them
+    if lease is None and table is not None and compaction_report(table) is None:
+        with traced("compact", rows=table.num_rows):
+            table = compact_table(table)
+
+    # Store result (Arrow) with the governor; the pandas view is built on first use
+    put_session_table("result", table, lease=lease)
+    st.session_state.results_version += 1
+    st.session_state.result_truncated = truncated
+    st.session_state.result_fingerprint = None
+    st.session_state.result_query = query
+
+    if table is not None:
+        # Names this exact table (profile / grid caches are process-wide): the same
+        # SQL can come back with other rows or another order. Sessions mapping the
+        # same shared file share the entries; every other result gets its own.
+        if lease is not None and lease.shared:
+            st.session_state.result_fingerprint = f"{lease.key}:{lease.published}"
+        else:
+            st.session_state.result_fingerprint = uuid.uuid4().hex
 
     # Detect schema change ONLY on SQL results
-    if detect_schema_change(df):
+    if detect_schema_change(get_result_profile()):
         st.session_state.chart_x = None
         st.session_state.chart_y = None
         st.session_state.chart_type_selected = None
         st.session_state.plot_ready = False
+        st.session_state.grid_filter_col = None
+        st.session_state.grid_sort_col = None
+
+    st.session_state.grid_page = 1
+
+
+# ---------------------------------------------------------
+# Background Job Monitor (polls while jobs are in flight)
+# ---------------------------------------------------------
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def render_query_jobs():
+    finished = False
+
+    for handle in list(st.session_state.query_jobs):
+        handle.refresh()
+
+        if handle.done:
+            st.session_state.query_jobs.remove(handle)
+            if handle.cancel_requested:
+                if not handle.future.cancelled() and handle.future.exception() is None and handle.result() is not None:
+                    # Finished before the cancel landed: nobody keeps its lease
+                    handle.result().release()
+                st.toast(f"Query `{handle.job_id}` cancelled.")
+                continue
+            try:
+                lease = handle.result()
+                store_query_result(lease.table, query=handle.query, lease=lease)
+            except Exception as e:
+                # Shown by the main view until dismissed: the app rerun below
+                # would wipe anything drawn here
+                st.session_state.query_error = str(e)
+                st.session_state.failed_jobs.append(
+                    {"id": handle.id, "job_id": handle.job_id, "query": handle.query}
+                )
+                continue
+            finished = True
+            continue
+
+        processed = handle.bytes_processed
+        col1, col2 = st.columns([4, 1])
+        with col1:
+            st.caption(
+                f"`{handle.job_id or handle.id}` · {handle.state} · "
+                f"{handle.elapsed:.0f}s elapsed"
+                + (f" · {processed / 1e6:,.1f} MB processed" if processed else "")
+            )
+        with col2:
+            st.button(
+                "Cancel",
+                on_click=handle.cancel,
+                disabled=handle.cancel_requested,
+                key=f"cancel_job_{handle.id}"
+            )
+
+    if finished or not st.session_state.query_jobs:
+        st.rerun(scope="app")
+
+
+def dismiss_failed_job(job_id: str):
+    st.session_state.failed_jobs = [f for f in st.session_state.failed_jobs if f["id"] != job_id]
+
+
+def render_failed_jobs():
+    for failed in st.session_state.failed_jobs:
+        safe_bigquery_error(None, context=f"Running background query `{failed['job_id'] or failed['id']}`")
+        with st.expander("Query"):
+            st.code(failed["query"], language="sql")
+        st.button(
+            "Dismiss",
+            on_click=dismiss_failed_job,
+            args=(failed["id"],),
+            key=f"dismiss_job_{failed['id']}"
+        )
+
+
+# ---------------------------------------------------------
+# Streaming Result View
+# ---------------------------------------------------------
+def stream_pending_query():
+    query = st.session_state.pending_stream_query
+    st.session_state.pending_stream_query = None
+
+    budget = ResultBudget(
+        max_rows=st.session_state.stream_max_rows,
+        max_bytes=st.session_state.stream_max_mb * 1024 * 1024,
+    )
+
+    status = st.empty()
+    grid = st.empty()
+
+    batches = []
+    last_render = 0.0
+    try:
+        max_bytes_billed = st.session_state.pending_stream_max_bytes_billed
+        for batch in run_query_pages(query, budget, max_bytes_billed):
+            batches.append(batch)
+            now = time.monotonic()
+            # First page once; afterwards only the row count changes
+            if len(batches) == 1:
+                grid.dataframe(batch.slice(0, GRID_PAGE_SIZES[1]))
+            if len(batches) == 1 or now - last_render >= STREAM_RENDER_INTERVAL_SECONDS:
+                status.caption(f"Fetching... {budget.rows:,} rows so far")
+                last_render = now
+    except Exception as e:
+        safe_bigquery_error(e, context="Streaming SQL query")
+        st.session_state.query_error = str(e)
+        status.empty()
+        return
+
+    status.empty()
+    grid.empty()
+
+    if not batches:
+        store_query_result(None)
+        return
+
+    store_query_result(
+        pa.Table.from_batches(batches), truncated=budget.truncated, query=query
+    )
 
 
 # ---------------------------------------------------------
-# Sidebar Chart Builder
+# Result Access (Arrow -> pandas, lazily)
 # ---------------------------------------------------------
-def build_sidebar_chart_builder():
-    st.sidebar.title("Chart Builder")
+def get_result_df():
+    def build(table):
+        with traced("to_dataframe", rows=table.num_rows):
+            return arrow_to_pandas(table)
+
+    # Cached next to the table, so a spill drops both
+    return get_memory_governor().frame(current_session_id(), "result", build)
+
+
+@st.cache_resource(max_entries=PROFILE_CACHE_ENTRIES, show_spinner=False)
+def get_column_profile(result_fingerprint: str, _table):
+    return ColumnProfile(_table)
+
+
+def get_result_profile():
+    table = get_result_table()
+    if table is None:
+        return None
+    return get_column_profile(st.session_state.result_fingerprint, table)
+
+
+# ---------------------------------------------------------
+# Sidebar (credentials, shared resource stats)
+# ---------------------------------------------------------
+def build_sidebar():
+    st.sidebar.title("BigQuery Key")
 
     user_key_json = st.sidebar.text_area(
         "BigQuery key (JSON):",
@@ -294,40 +1296,121 @@ def build_sidebar_chart_builder():
         on_click=lambda: user_key_handler(user_key_json),
         key="save_key_btn"
     )
- 
-    df = st.session_state.initial_df
 
-    if df is None or df.empty:
-        st.sidebar.info("Run a SQL query to enable charting")
+    cache_stats = get_result_cache().stats()
+    st.sidebar.caption(
+        f"Result cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses, "
+        f"{cache_stats['entries']} entries ({cache_stats['bytes'] / 1e6:.1f} MB)"
+    )
+
+    pool_stats = get_client_pool().stats()
+    st.sidebar.caption(
+        f"Client pool: {pool_stats['size']}/{pool_stats['max_size']} clients, "
+        f"{pool_stats['reuse_rate']:.0%} reuse, {pool_stats['evicted']} evicted"
+    )
+
+
+# ---------------------------------------------------------
+# Fragments (widget changes rerun only their own section)
+# ---------------------------------------------------------
+def traced_fragment(func):
+    # Fragment reruns skip the main block, so each fragment opens its own trace
+    @st.fragment
+    @functools.wraps(func)
+    def run(*args, **kwargs):
+        with get_tracer().trace(func.__name__) as trace:
+            func(*args, **kwargs)
+        st.session_state.last_trace = trace
+
+    return run
+
+
+def rerun_app_if_results_changed():
+    # Jobs, results and the chart live outside the calling fragment;
+    # a full run draws them after this point anyway
+    ctx = get_script_run_ctx()
+    if not (ctx and ctx.fragment_ids_this_run):
         return
+    if st.session_state.results_version != st.session_state.rendered_results_version:
+        st.rerun(scope="app")
 
-    all_cols = list(df.columns)
 
-    x_field = st.sidebar.selectbox(
-        "X-axis",
-        all_cols,
-        key="chart_x"
-    )
+# ---------------------------------------------------------
+# Chart Builder (fragment: axis / type changes redraw only the chart)
+# ---------------------------------------------------------
+@traced_fragment
+def chart_fragment():
+    st.subheader("Chart Builder")
 
-    y_field = st.sidebar.selectbox(
-        "Y-axis",
-        all_cols,
-        key="chart_y"
-    )
+    table = get_result_table()
 
-    chart_type = st.sidebar.radio(
-        "Chart Type",
-        ["Scatter", "Line", "Bar"],
-        key="chart_type_selected"
-    )
+    if table_is_empty(table):
+        st.info("Run a SQL query to enable charting")
+        return
 
-    st.sidebar.button(
+    all_cols = list(table.column_names)
+
+    col1, col2, col3 = st.columns([2, 2, 3])
+    with col1:
+        x_field = st.selectbox(
+            "X-axis",
+            all_cols,
+            key="chart_x"
+        )
+
+    with col2:
+        y_field = st.selectbox(
+            "Y-axis",
+            all_cols,
+            key="chart_y"
+        )
+
+    with col3:
+        chart_type = st.radio(
+            "Chart Type",
+            ["Scatter", "Line", "Bar"],
+            horizontal=True,
+            key="chart_type_selected"
+        )
+
+    col1, col2, col3 = st.columns([2, 2, 3])
+    with col1:
+        st.number_input(
+            "Max points",
+            min_value=100,
+            step=1_000,
+            key="chart_point_budget"
+        )
+
+    with col2:
+        if chart_type == "Line":
+            st.selectbox(
+                "Line downsampling",
+                LINE_DOWNSAMPLE_METHODS,
+                key="line_downsample_method"
+            )
+
+    with col3:
+        if pushdown_eligible(x_field, chart_type):
+            st.checkbox("Aggregate in BigQuery", key="chart_pushdown")
+
+            if st.session_state.chart_pushdown:
+                profile = get_result_profile()
+                aggregations = list(AGGREGATIONS)
+                if profile.kinds.get(y_field) != "numeric":
+                    aggregations = ["COUNT"]
+                st.selectbox("Aggregation", aggregations, key="chart_aggregation")
+
+                if profile.kinds.get(x_field) == "temporal":
+                    st.selectbox("Time bucket", TIME_BUCKETS, key="chart_time_bucket")
+
+    st.button(
         "Plot",
         on_click=lambda: st.session_state.update({"plot_ready": True}),
         key="chart_builder_plot_btn"
     )
 
-   
+    render_plot_if_ready()
 
 
 # ---------------------------------------------------------
@@ -337,12 +1420,66 @@ def render_plot_if_ready():
     if not st.session_state.get("plot_ready"):
         return
 
-    df = st.session_state.initial_df
+    df = get_result_df()
     x = st.session_state.chart_x
     y = st.session_state.chart_y
     chart_type = st.session_state.chart_type_selected
 
-    plotting_altair(df, x, y, chart_type)
+    if st.session_state.chart_pushdown and pushdown_eligible(x, chart_type):
+        plot_aggregate_pushdown(x, y, chart_type)
+        return
+
+    plotting_altair(df, x, y, chart_type, profile=get_result_profile())
+
+
+# ---------------------------------------------------------
+# Aggregation Push-down (GROUP BY runs in BigQuery)
+# ---------------------------------------------------------
+def pushdown_eligible(x: str, chart_type: str) -> bool:
+    if not st.session_state.result_query or chart_type not in ("Bar", "Line"):
+        return False
+    profile = get_result_profile()
+    if profile is None or x not in profile.kinds:
+        return False
+    # Line charts over a numeric x are downsampled instead
+    return chart_type == "Bar" or profile.kinds[x] != "numeric"
+
+
+def plot_aggregate_pushdown(x: str, y: str, chart_type: str):
+    profile = get_result_profile()
+    aggregation = st.session_state.chart_aggregation
+    if aggregation not in AGGREGATIONS or profile.kinds.get(y) != "numeric":
+        aggregation = "COUNT"
+
+    time_bucket = None
+    if profile.kinds.get(x) == "temporal":
+        time_bucket = st.session_state.chart_time_bucket
+
+    sql, x_alias, y_alias = build_aggregate_query(
+        st.session_state.result_query,
+        x,
+        y,
+        aggregation,
+        x_arrow_type=get_result_table().schema.field(x).type,
+        time_bucket=time_bucket,
+        cast_y=y in profile.numeric_views,
+        max_groups=PUSHDOWN_MAX_GROUPS,
+    )
+
+    result, error = run_query(sql, max_bytes_billed_setting())
+    if error or result is None:
+        st.error("Aggregate query failed.")
+        return
+
+    try:
+        groups = result.table.num_rows
+        plotting_altair(arrow_to_pandas(result.table), x_alias, y_alias, chart_type)
+    finally:
+        result.release()
+
+    st.caption(f"{aggregation} of `{y}` by `{x}` computed in BigQuery: {groups:,} groups transferred")
+    with st.expander("Aggregate SQL"):
+        st.code(sql, language="sql")
 
 
 # ---------------------------------------------------------
@@ -351,8 +1488,59 @@ def render_plot_if_ready():
 def build_main_view():
     st.title("BigQuery Explorer")
 
+    catalog_fragment()
+    sql_editor_fragment()
+
+    # -----------------------------
+    # Query Results
+    # -----------------------------
+    if st.session_state.query_jobs:
+        render_query_jobs()
+
+    if st.session_state.failed_jobs:
+        render_failed_jobs()
+
+    if st.session_state.pending_stream_query:
+        stream_pending_query()
+
+    if st.session_state.run_mode == "Batch" and st.session_state.batch_results:
+        render_batch_results()
+
+    if st.session_state.run_mode == "Incremental":
+        render_incremental_info()
+
+    results_fragment()
+    chart_fragment()
+
+
+# ---------------------------------------------------------
+# Catalog (fragment: search, dataset / table pickers, schema preview)
+# ---------------------------------------------------------
+@traced_fragment
+def catalog_fragment():
     # Dataset selection
     datasets = get_all_datasets()
+    matched = None
+
+    search = st.text_input(
+        "Search datasets, tables and columns",
+        placeholder="e.g. taxi, covid, zip_code",
+        key="catalog_search"
+    )
+
+    if search.strip():
+        matches = search_catalog(search)
+        if matches:
+            matched = group_matches(matches)
+            datasets = list(matched)
+            with st.expander(f"{len(matches)} matches"):
+                st.dataframe(
+                    pd.DataFrame(matches)[["kind", "dataset", "table", "column"]],
+                    hide_index=True,
+                )
+        else:
+            st.info("No matches in the catalog yet. Showing all datasets.")
+
     selected_dataset = st.selectbox("Select Dataset", datasets, key="main_dataset_select")
 
     # Load tables when dataset changes
@@ -364,12 +1552,16 @@ def build_main_view():
             .reset_index(drop=True)
         )
         st.session_state.selected_table = None
+        get_dataset_columns(selected_dataset)
 
     df_schema = st.session_state.schema
 
     # --- NEW: Table selection via selectbox ---
     table_list = df_schema["table_id"].tolist()
 
+    if matched and matched.get(selected_dataset):
+        table_list = [t for t in matched[selected_dataset] if t in table_list]
+
     selected_table = st.selectbox(
         "Select a table",
         table_list,
@@ -397,9 +1589,14 @@ def build_main_view():
     if st.session_state.selected_table:
         show_table_preview(st.session_state.selected_table)
 
-    # -----------------------------
-    # SQL Query Input
-    # -----------------------------
+
+# ---------------------------------------------------------
+# SQL Editor (fragment: query text, run options, submit)
+# ---------------------------------------------------------
+@traced_fragment
+def sql_editor_fragment():
+    selected_dataset = st.session_state.selected_dataset
+
     st.text_area(
         "Enter SQL Query",
         value=f"SELECT * \nFROM `bigquery-public-data.<dataset_id>.<table_id>`\nLIMIT 10;",
@@ -407,6 +1604,35 @@ def build_main_view():
         key="main_query_text"
     )
 
+    st.radio("Run mode", RUN_MODES, horizontal=True, key="run_mode")
+
+    with st.expander("Cost guardrail"):
+        col1, col2 = st.columns(2)
+        with col1:
+            st.number_input("Confirm above (GB)", min_value=0.0, step=1.0, key="confirm_gb")
+        with col2:
+            st.number_input("Max bytes billed (GB)", min_value=0.1, step=10.0, key="max_gb_billed")
+
+    if st.session_state.run_mode == "Stream":
+        col1, col2 = st.columns(2)
+        with col1:
+            st.number_input("Max rows", min_value=1, step=10_000, key="stream_max_rows")
+        with col2:
+            st.number_input("Max MB", min_value=1, step=16, key="stream_max_mb")
+
+    if st.session_state.run_mode == "Incremental":
+        st.text_input(
+            "Watermark column",
+            placeholder="e.g. event_date (must be in the SELECT list)",
+            key="incremental_column"
+        )
+        st.checkbox(
+            "Source tables are append-only",
+            help="Unpartitioned tables are fully refreshed whenever they change, "
+                 "unless rows are only ever appended.",
+            key="incremental_append_only"
+        )
+
     st.button(
         "Submit Query",
         on_click=submit_handler_main,
@@ -414,12 +1640,335 @@ def build_main_view():
         key="submit_main"
     )
 
-    # -----------------------------
-    # Query Results
-    # -----------------------------
-    if st.session_state.initial_df is not None:
+    render_cost_estimate(selected_dataset)
+
+    rerun_app_if_results_changed()
+
+
+# ---------------------------------------------------------
+# Results (fragment: grid filter / sort, profile, local SQL)
+# ---------------------------------------------------------
+@traced_fragment
+def results_fragment():
+    table = get_result_table()
+    if table is not None:
         st.write("Query Result:")
-        st.dataframe(st.session_state.initial_df)
+        if st.session_state.result_truncated:
+            st.warning(
+                f"Result truncated at {table.num_rows:,} rows "
+                "(row/byte limit reached). Narrow the query or raise the limits."
+            )
+        render_paged_grid(table, "grid", st.session_state.result_fingerprint)
+        render_compaction_report(table)
+
+        with st.expander("Column profile"):
+            st.dataframe(get_result_profile().summary(), hide_index=True)
+
+        render_local_sql()
+
+    rerun_app_if_results_changed()
+
+
+# ---------------------------------------------------------
+# Result Memory (dtype compaction report)
+# ---------------------------------------------------------
+def compaction_caption(table) -> str:
+    report = compaction_report(table)
+    if not report:
+        return ""
+    before, after = report["before"], report["after"]
+    saved = f", {1 - after / before:.0%} smaller" if before and after < before else ""
+    return (
+        f"Memory: {format_bytes(before)} → {format_bytes(after)}{saved} "
+        f"({len(report['columns'])} of {len(table.schema)} columns compacted)"
+    )
+
+
+def render_compaction_report(table):
+    caption = compaction_caption(table)
+    if not caption:
+        return
+    report = compaction_report(table)
+    st.caption(caption)
+    if report["columns"]:
+        with st.expander("Column compaction"):
+            st.dataframe(
+                pd.DataFrame(
+                    [{"column": c, "change": change} for c, change in report["columns"].items()]
+                ),
+                hide_index=True,
+            )
+
+
+# ---------------------------------------------------------
+# Results Grid (paged; sort / filter stay on the server as Arrow)
+# ---------------------------------------------------------
+@st.cache_resource
+def get_grid_index_cache():
+    return GridIndexCache(max_bytes=GRID_INDEX_CACHE_BYTES)
+
+
+def reset_grid_page(key: str):
+    st.session_state[f"{key}_page"] = 1
+
+
+def render_paged_grid(table, key: str, fingerprint: str = None):
+    # Only the visible page is sent to the browser. fingerprint (per stored table,
+    # see store_query_result) enables sort / filter and keys the shared index cache
+    filter_col = filter_text = sort_col = None
+    descending = False
+
+    if fingerprint is not None:
+        columns = [None] + table.column_names
+        col1, col2, col3, col4 = st.columns([2, 3, 2, 1])
+        with col1:
+            filter_col = st.selectbox(
+                "Filter column", columns, format_func=lambda c: c or "—",
+                on_change=reset_grid_page, args=(key,), key=f"{key}_filter_col"
+            )
+        with col2:
+            filter_text = st.text_input(
+                "Contains", on_change=reset_grid_page, args=(key,), key=f"{key}_filter_text"
+            )
+        with col3:
+            sort_col = st.selectbox(
+                "Sort by", columns, format_func=lambda c: c or "—",
+                on_change=reset_grid_page, args=(key,), key=f"{key}_sort_col"
+            )
+        with col4:
+            descending = st.checkbox(
+                "Desc", on_change=reset_grid_page, args=(key,), key=f"{key}_sort_desc"
+            )
+
+    indices = None
+    if (filter_col and filter_text) or sort_col:
+        try:
+            with traced("grid_index", rows=table.num_rows):
+                indices = view_indices(
+                    table, get_grid_index_cache(), fingerprint,
+                    filter_col, filter_text, sort_col, descending
+                )
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+            st.error(f"Filter failed: {e}")
+
+    total = table.num_rows if indices is None else len(indices)
+
+    page_size = st.session_state.get(f"{key}_page_size", GRID_PAGE_SIZES[1])
+    pages = max(1, -(-total // page_size))
+    # Widget state may point past the last page after a filter / page size change
+    st.session_state[f"{key}_page"] = min(max(1, st.session_state.get(f"{key}_page", 1)), pages)
+
+    offset = (st.session_state[f"{key}_page"] - 1) * page_size
+    view = page(table, indices, offset, page_size)
+
+    df = arrow_to_pandas(view)
+    df.index = pd.RangeIndex(offset + 1, offset + 1 + len(df))
+    st.dataframe(df)
+
+    col1, col2, col3 = st.columns([3, 2, 2])
+    with col1:
+        shown = f"Rows {offset + 1:,}–{offset + len(df):,} of {total:,}" if total else "No rows"
+        if total != table.num_rows:
+            shown += f" (filtered from {table.num_rows:,})"
+        st.caption(shown)
+    with col2:
+        st.number_input(
+            f"Page (of {pages:,})", min_value=1, max_value=pages, step=1, key=f"{key}_page"
+        )
+    with col3:
+        st.selectbox(
+            "Rows per page", GRID_PAGE_SIZES, index=1,
+            on_change=reset_grid_page, args=(key,), key=f"{key}_page_size"
+        )
+
+
+# ---------------------------------------------------------
+# Local Refinement (DuckDB over the last result)
+# ---------------------------------------------------------
+def get_local_engine():
+    if local_engine.duckdb is None:
+        return None
+
+    if st.session_state.local_engine is None:
+        st.session_state.local_engine = LocalEngine()
+    return st.session_state.local_engine
+
+
+def run_local_sql():
+    try:
+        result = get_local_engine().query(get_result_table(), st.session_state.local_sql_text)
+        put_session_table("local_result", result)
+        st.session_state.local_error = None
+    except Exception as e:
+        put_session_table("local_result", None)
+        st.session_state.local_error = str(e)
+
+
+def promote_local_result():
+    store_query_result(get_session_table("local_result"))
+    put_session_table("local_result", None)
+
+
+def render_local_sql():
+    with st.expander(f"Refine locally (DuckDB, table: `{LOCAL_TABLE}`)"):
+        if local_engine.duckdb is None:
+            st.info("Install `duckdb` to query the last result locally.")
+            return
+
+        st.text_area(
+            "Local SQL",
+            value=f"SELECT *\nFROM {LOCAL_TABLE}\nLIMIT 100",
+            height=120,
+            key="local_sql_text"
+        )
+        st.button("Run locally", on_click=run_local_sql, key="run_local_sql_btn")
+
+        if st.session_state.local_error:
+            st.error(st.session_state.local_error)
+
+        local_result = get_session_table("local_result")
+        if local_result is not None:
+            render_paged_grid(local_result, "local_grid")
+            st.button(
+                "Use as query result",
+                on_click=promote_local_result,
+                key="promote_local_result_btn"
+            )
+
+
+# ---------------------------------------------------------
+# Rerun Trace Panel (waterfall of the previous rerun)
+# ---------------------------------------------------------
+def render_trace_panel():
+    import altair as alt
+
+    trace = st.session_state.last_trace
+    with st.expander("Rerun trace", expanded=True):
+        if trace is None:
+            st.caption("No completed rerun yet.")
+            return
+
+        rows = pd.DataFrame(trace.waterfall())
+        st.caption(
+            f"Trace `{trace.trace_id}` · previous rerun took {trace.root.seconds * 1e3:,.0f} ms "
+            f"across {len(rows) - 1} spans"
+        )
+        chart = (
+            alt.Chart(rows)
+            .mark_bar()
+            .encode(
+                x=alt.X("start_ms:Q", title="ms since rerun start"),
+                x2="end_ms:Q",
+                y=alt.Y("span:N", sort=None, title=None),
+                color=alt.condition(alt.datum.error != "", alt.value("firebrick"), alt.value("steelblue")),
+                tooltip=["span", alt.Tooltip("duration_ms:Q", format=",.1f"), "error"],
+            )
+            .properties(height=max(120, 22 * len(rows)))
+        )
+        st.altair_chart(chart, use_container_width=True)
+
+        stages = pd.DataFrame(get_tracer().registry.histogram_summary(Tracer.STAGE_METRIC))
+        if not stages.empty:
+            stages["mean_ms"] = stages["sum"] / stages["count"] * 1e3
+            st.dataframe(
+                stages[["stage", "count", "mean_ms"]].sort_values("mean_ms", ascending=False),
+                hide_index=True,
+            )
+
+
+# ---------------------------------------------------------
+# Admin / Debug Page
+# ---------------------------------------------------------
+def build_admin_page():
+    st.title("Admin / Debug")
+    this_session = current_session_id()
+
+    memory = get_memory_governor().stats()
+    st.subheader("Memory governor")
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric(
+        "Resident",
+        format_bytes(memory["resident_bytes"]),
+        f"{memory['resident_bytes'] / memory['process_budget']:.0%} of budget",
+        delta_color="off",
+    )
+    col2.metric("Spilled to disk", format_bytes(memory["spilled_bytes"]))
+    col3.metric("Spills", memory["spills"])
+    col4.metric("Reloads", memory["reloads"])
+    st.caption(
+        f"Process budget {format_bytes(memory['process_budget'])} · "
+        f"per-session budget {format_bytes(memory['session_budget'])} · "
+        f"results over {format_bytes(MEMORY_LARGE_RESULT_BYTES)} are memory-mapped from disk"
+    )
+
+    admission = get_admission().stats()
+    st.subheader("BigQuery admission")
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Running", admission["running"], f"limit {admission['max_concurrent']}", delta_color="off")
+    col2.metric("Queued", admission["queued"])
+    col3.metric("Admitted", admission["admitted"])
+    col4.metric("Timed out", admission["timeouts"])
+    st.caption(
+        f"Queued jobs are admitted round-robin across sessions; set EXPLORER_MAX_CONCURRENT_QUERIES "
+        f"to change the limit. Waits time out after {ADMISSION_QUEUE_TIMEOUT_SECONDS // 60} minutes."
+    )
+    if admission["queued_by_session"]:
+        st.dataframe(
+            pd.DataFrame(
+                [
+                    {"session": sid + (" (you)" if sid == this_session else ""), "queued": count}
+                    for sid, count in admission["queued_by_session"].items()
+                ]
+            ),
+            hide_index=True,
+        )
+
+    shared = get_shared_results().stats()
+    st.subheader("Shared results")
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("On disk", format_bytes(shared["bytes"]), f"{shared['files']} results", delta_color="off")
+    col2.metric("Mapped by this process", format_bytes(shared["mapped_bytes_here"]))
+    col3.metric("Session references", shared["refs_here"])
+    col4.metric("Process leases (host)", shared["leases"])
+    st.caption(
+        f"Finished results are Arrow IPC files under `{SHARED_RESULTS_DIR}`, mapped read-only by every "
+        f"session and process on the host; sessions here reference "
+        f"{format_bytes(memory['shared_bytes'])} of them without a private copy"
+    )
+
+    st.dataframe(
+        pd.DataFrame(
+            [
+                {
+                    "session": sid + (" (you)" if sid == this_session else ""),
+                    "resident": format_bytes(row["resident_bytes"]),
+                    "spilled": format_bytes(row["spilled_bytes"]),
+                    "shared": format_bytes(row["shared_bytes"]),
+                    "results": ", ".join(sorted(row["keys"])),
+                }
+                for sid, row in memory["sessions"].items()
+            ],
+            columns=["session", "resident", "spilled", "shared", "results"],
+        ),
+        hide_index=True,
+    )
+
+    server = get_metrics_server()
+    st.subheader("Metrics endpoint")
+    if server:
+        st.caption(f"Prometheus: {server.url}/metrics · OTLP JSON traces: {server.url}/traces")
+    else:
+        st.caption(f"Not running (port {METRICS_PORT} unavailable). Set EXPLORER_METRICS_PORT to another port.")
+
+    st.subheader("Shared resources")
+    st.json({
+        "result_cache": get_result_cache().stats(),
+        "client_pool": get_client_pool().stats(),
+        "catalog": get_catalog().stats(),
+        "grid_index_cache": get_grid_index_cache().stats(),
+        "single_flight": get_query_flights().stats(),
+    })
+
 
 # ---------------------------------------------------------
 # App Layout
@@ -428,7 +1977,25 @@ def init_state():
     defaults = {
         "schema": pd.DataFrame({"table_id": []}),
         "selected_dataset": None,
-        "initial_df": None,
+        "result_truncated": False,
+        "result_fingerprint": None,
+        "run_mode": RUN_MODES[0],
+        "query_jobs": [],
+        "failed_jobs": [],
+        "batch_results": None,
+        "batch_seconds": 0.0,
+        "incremental_column": "",
+        "incremental_info": None,
+        "incremental_append_only": False,
+        "stream_max_rows": STREAM_DEFAULT_MAX_ROWS,
+        "stream_max_mb": STREAM_DEFAULT_MAX_MB,
+        "pending_stream_query": None,
+        "pending_stream_max_bytes_billed": None,
+        "confirm_gb": float(DEFAULT_CONFIRM_GB),
+        "max_gb_billed": float(DEFAULT_MAX_GB_BILLED),
+        "last_estimate": None,
+        "pending_confirmation": None,
+        "confirmed_query": None,
         "query_error": None,
         "plot_ready": False,
         "chart_x": None,
@@ -436,18 +2003,47 @@ def init_state():
         "chart_type_selected": None,
         "user_key_json": None,
         "client": None,
+        "client_identity": None,
         "full_dataset_path": None,
-        "selected_table": None, 
+        "selected_table": None,
+        "catalog_warmed": False,
+        "chart_point_budget": DEFAULT_CHART_POINT_BUDGET,
+        "line_downsample_method": LINE_DOWNSAMPLE_METHODS[0],
+        "result_query": None,
+        "chart_pushdown": False,
+        "chart_aggregation": "COUNT",
+        "chart_time_bucket": "DAY",
+        "local_engine": None,
+        "local_error": None,
+        "show_admin": False,
+        "show_trace": False,
+        "results_version": 0,
+        "rendered_results_version": 0,
+        "last_trace": None,
     }
     for k, v in defaults.items():
         if k not in st.session_state:
             st.session_state[k] = v
 
+    if "memory_lease" not in st.session_state:
+        st.session_state.memory_lease = SessionLease(get_memory_governor(), current_session_id())
+
 
 def build_layout():
+    if st.sidebar.toggle("Admin / debug page", key="show_admin"):
+        build_admin_page()
+        return
+
+    st.sidebar.toggle("Show rerun trace", key="show_trace")
+
     build_main_view()
-    build_sidebar_chart_builder()
-    render_plot_if_ready()
+    build_sidebar()
+
+    if st.session_state.show_trace:
+        render_trace_panel()
+
+    # Everything that depends on the result was drawn in this run
+    st.session_state.rendered_results_version = st.session_state.results_version
 
 
 # ---------------------------------------------------------
@@ -455,4 +2051,10 @@ def build_layout():
 # ---------------------------------------------------------
 if __name__ == "__main__":
     init_state()
-    build_layout()
\ No newline at end of file
+    get_metrics_server()
+
+    # Widget callbacks ran before this point; their spans are adopted by the trace
+    with get_tracer().trace("rerun", session=current_session_id()) as trace:
+        refresh_session_client()
+        build_layout()
+    st.session_state.last_trace = trace
\ No newline at end of file
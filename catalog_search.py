@@ -0,0 +1,70 @@
+import heapq
+import re
+from collections import Counter, defaultdict
+
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+KIND_WEIGHT = {"dataset": 0.3, "table": 0.2, "column": 0.0}
+
+
+def trigrams(text: str) -> set:
+    # pg_trgm style: words padded so short prefixes still produce grams
+    grams = set()
+    for word in WORD_RE.findall((text or "").lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+# ---------------------------------------------------------
+# Trigram Search Index (datasets, tables, columns)
+# ---------------------------------------------------------
+class CatalogSearchIndex:
+    def __init__(self, docs: list):
+        # doc: {"kind", "dataset", "table", "column", "description"}
+        self.docs = docs
+        self._names = []
+        self._name_postings = defaultdict(list)
+        self._desc_postings = defaultdict(list)
+
+        for doc_id, doc in enumerate(docs):
+            name = doc.get(doc["kind"]) or ""
+            self._names.append(name.lower())
+            for gram in trigrams(name):
+                self._name_postings[gram].append(doc_id)
+            for gram in trigrams(doc.get("description")):
+                self._desc_postings[gram].append(doc_id)
+
+    def __len__(self):
+        return len(self.docs)
+
+    def search(self, query: str, limit: int = 50, min_score: float = 0.7) -> list:
+        query = (query or "").strip().lower()
+        grams = trigrams(query)
+        if not grams:
+            return []
+
+        name_hits = Counter()
+        desc_hits = Counter()
+        for gram in grams:
+            name_hits.update(self._name_postings.get(gram, ()))
+            desc_hits.update(self._desc_postings.get(gram, ()))
+
+        total = len(grams)
+        scored = []
+        for doc_id in name_hits.keys() | desc_hits.keys():
+            score = name_hits[doc_id] / total + 0.5 * desc_hits[doc_id] / total
+
+            name = self._names[doc_id]
+            if name == query:
+                score += 2.0
+            elif name.startswith(query):
+                score += 1.0
+            elif query in name:
+                score += 0.5
+
+            score += KIND_WEIGHT[self.docs[doc_id]["kind"]]
+            if score >= min_score:
+                scored.append((score, -doc_id))
+
+        return [self.docs[-neg_id] for _, neg_id in heapq.nlargest(limit, scored)]
@@ -0,0 +1,168 @@
+import datetime
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+from google.auth.transport.requests import AuthorizedSession, Request
+from google.cloud import bigquery
+from google.oauth2 import service_account
+
+
+def credential_identity(key_dict: dict) -> str:
+    # Digest of the whole key (private_key included), however the JSON was
+    # formatted: knowing the email and key id alone doesn't reach a pooled client
+    canonical = json.dumps(key_dict, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class _PooledClient:
+    def __init__(self, client, credentials):
+        self.client = client
+        self.credentials = credentials
+        self.created_at = time.time()
+        self.last_used = self.created_at
+        self.refreshing = False
+
+
+# ---------------------------------------------------------
+# BigQuery Client Pool (keyed by service account identity)
+# ---------------------------------------------------------
+class ClientPool:
+    def __init__(self, max_size: int, idle_ttl: float, refresh_margin: float, http_pool_size: int = 32):
+        self.max_size = max_size
+        self.idle_ttl = idle_ttl
+        self.refresh_margin = refresh_margin
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        # One keep-alive connection pool shared by every client's session
+        self._adapter = requests.adapters.HTTPAdapter(
+            pool_connections=http_pool_size, pool_maxsize=http_pool_size
+        )
+
+        self.created = 0
+        self.reused = 0
+        self.evicted = 0
+        self.token_refreshes = 0
+
+    # -----------------------------
+    # Public API
+    # -----------------------------
+    def get(self, key_dict: dict):
+        identity = credential_identity(key_dict)
+
+        with self._lock:
+            self._evict_idle()
+            entry = self._entries.get(identity)
+            if entry is not None:
+                self.reused += 1
+                self._mark_used(identity, entry)
+                return entry.client
+
+        # Build outside the lock; a racing duplicate is simply dropped
+        credentials = service_account.Credentials.from_service_account_info(
+            key_dict, scopes=bigquery.Client.SCOPE
+        )
+        http = AuthorizedSession(credentials, auth_request=Request(self._session()))
+        http.mount("https://", self._adapter)
+        client = bigquery.Client(
+            credentials=credentials, project=credentials.project_id, _http=http
+        )
+
+        with self._lock:
+            existing = self._entries.get(identity)
+            if existing is not None:
+                self.reused += 1
+                self._mark_used(identity, existing)
+                return existing.client
+
+            self.created += 1
+            self._entries[identity] = _PooledClient(client, credentials)
+            self._evict_overflow()
+
+        self._refresh_if_due(self._entries.get(identity))
+        return client
+
+    def touch(self, identity: str):
+        # Called on each rerun by sessions holding a pooled client
+        with self._lock:
+            self._evict_idle()
+            entry = self._entries.get(identity)
+            if entry is None:
+                return None
+            self._mark_used(identity, entry)
+
+        self._refresh_if_due(entry)
+        return entry.client
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.created + self.reused
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "created": self.created,
+                "reused": self.reused,
+                "evicted": self.evicted,
+                "token_refreshes": self.token_refreshes,
+                "reuse_rate": (self.reused / lookups) if lookups else 0.0,
+            }
+
+    # -----------------------------
+    # Internals
+    # -----------------------------
+    def _session(self):
+        session = requests.Session()
+        session.mount("https://", self._adapter)
+        return session
+
+    def _mark_used(self, identity, entry):
+        entry.last_used = time.time()
+        self._entries.move_to_end(identity)
+
+    def _evict_idle(self):
+        cutoff = time.time() - self.idle_ttl
+        for identity in [i for i, e in self._entries.items() if e.last_used < cutoff]:
+            # Not closed: sessions still holding it keep working, and the
+            # HTTP adapter is shared with the rest of the pool.
+            del self._entries[identity]
+            self.evicted += 1
+
+    def _evict_overflow(self):
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evicted += 1
+
+    def _refresh_if_due(self, entry):
+        if entry is None:
+            return
+
+        credentials = entry.credentials
+        expiry = credentials.expiry
+        if credentials.token and expiry is not None:
+            # google-auth stores expiry as naive UTC
+            now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+            remaining = (expiry - now).total_seconds()
+            if remaining > self.refresh_margin:
+                return
+
+        with self._lock:
+            if entry.refreshing:
+                return
+            entry.refreshing = True
+
+        def worker():
+            try:
+                credentials.refresh(Request(self._session()))
+                with self._lock:
+                    self.token_refreshes += 1
+            except Exception:
+                # The next request refreshes on demand anyway
+                pass
+            finally:
+                entry.refreshing = False
+
+        threading.Thread(target=worker, name="bq-token-refresh", daemon=True).start()
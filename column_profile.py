@@ -0,0 +1,78 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+
+# ---------------------------------------------------------
+# Column Profile (computed once per query result)
+# ---------------------------------------------------------
+class ColumnProfile:
+    def __init__(self, table: pa.Table):
+        self.columns = tuple(table.column_names)
+        self.num_rows = table.num_rows
+        self.kinds = {}
+        self.null_counts = {}
+        self.cardinality = {}
+        # Numeric-looking string columns, already parsed (pandas, ArrowDtype)
+        self.numeric_views = {}
+
+        for name, column in zip(table.column_names, table.columns):
+            if pa.types.is_dictionary(column.type):
+                # Compacted string columns: hash / cast kernels want plain strings
+                column = column.cast(column.type.value_type)
+            self.null_counts[name] = column.null_count
+            self.cardinality[name] = _count_distinct(column)
+            self.kinds[name] = self._classify(name, column)
+
+    def _classify(self, name: str, column: pa.ChunkedArray) -> str:
+        arrow_type = column.type
+
+        if pa.types.is_integer(arrow_type) or pa.types.is_floating(arrow_type) or pa.types.is_decimal(arrow_type):
+            return "numeric"
+
+        if pa.types.is_timestamp(arrow_type) or pa.types.is_date(arrow_type):
+            return "temporal"
+
+        if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+            try:
+                parsed = column.cast(pa.float64())
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+                return "categorical"
+            self.numeric_views[name] = parsed.to_pandas(types_mapper=pd.ArrowDtype)
+            return "numeric"
+
+        return "categorical"
+
+    @property
+    def numeric_columns(self) -> list:
+        return [c for c in self.columns if self.kinds[c] == "numeric"]
+
+    @property
+    def categorical_columns(self) -> list:
+        return [c for c in self.columns if self.kinds[c] == "categorical"]
+
+    def vega_type(self, column: str) -> str:
+        return {"numeric": "Q", "temporal": "T"}.get(self.kinds.get(column), "N")
+
+    def chart_frame(self, df: pd.DataFrame, fields: list) -> pd.DataFrame:
+        # Only the plotted columns, with parsed numeric views swapped in
+        data = {}
+        for field in dict.fromkeys(fields):
+            data[field] = self.numeric_views.get(field, df[field])
+        return pd.DataFrame(data, index=df.index)
+
+    def summary(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            "column": self.columns,
+            "kind": [self.kinds[c] for c in self.columns],
+            "nulls": [self.null_counts[c] for c in self.columns],
+            "distinct": [self.cardinality[c] for c in self.columns],
+        })
+
+
+def _count_distinct(column: pa.ChunkedArray):
+    try:
+        return pc.count_distinct(column, mode="all").as_py()
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        # Nested types (STRUCT / ARRAY) have no hash kernel
+        return None
@@ -0,0 +1,114 @@
+import json
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+
+REPORT_KEY = b"explorer.compaction"
+DICTIONARY_MAX_RATIO = 0.5
+DICTIONARY_MIN_ROWS = 1_000
+DICTIONARY_SAMPLE_ROWS = 10_000
+
+INT_TYPES = [pa.int8(), pa.int16(), pa.int32()]
+# compact_column's inputs, by the name the report records them under
+ORIGINAL_TYPES = {str(t): t for t in (pa.int64(), pa.float64(), pa.string(), pa.large_string())}
+INDEX_TYPES = [(2 ** 7, pa.int8()), (2 ** 15, pa.int16()), (2 ** 31, pa.int32())]
+
+
+# ---------------------------------------------------------
+# Column Compaction (schema + value statistics, lossless)
+# ---------------------------------------------------------
+def compact_column(column: pa.ChunkedArray, num_rows: int):
+    # Returns the narrower column, or None to keep it as is
+    arrow_type = column.type
+
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        if num_rows < DICTIONARY_MIN_ROWS:
+            return None
+        # A slice first: ID-like columns bail out without hashing every row
+        sample = column.slice(0, DICTIONARY_SAMPLE_ROWS)
+        if pc.count_distinct(sample, mode="all").as_py() > len(sample) * DICTIONARY_MAX_RATIO:
+            return None
+        distinct = pc.count_distinct(column, mode="all").as_py()
+        if distinct > num_rows * DICTIONARY_MAX_RATIO:
+            return None
+        index_type = next(t for limit, t in INDEX_TYPES if distinct <= limit)
+        return column.dictionary_encode().cast(pa.dictionary(index_type, arrow_type))
+
+    if pa.types.is_int64(arrow_type):
+        bounds = pc.min_max(column).as_py()
+        if bounds["min"] is None:
+            return None
+        for target in INT_TYPES:
+            low, high = _int_bounds(target)
+            if low <= bounds["min"] and bounds["max"] <= high:
+                return column.cast(target)
+        return None
+
+    if pa.types.is_float64(arrow_type):
+        if column.null_count == num_rows:
+            return None
+        # Only when every value survives the round trip (NaN never does)
+        narrow = column.cast(pa.float32())
+        if not pc.all(pc.equal(narrow.cast(pa.float64()), column)).as_py():
+            return None
+        return narrow
+
+    return None
+
+
+def compact_table(table: pa.Table) -> pa.Table:
+    # The before / after report travels in the schema metadata, so it
+    # survives the result cache (Parquet) and shared files (IPC)
+    if table is None or table.num_rows == 0:
+        return table
+
+    before = table.nbytes
+    changes = {}
+    for i, field in enumerate(table.schema):
+        try:
+            compacted = compact_column(table.column(i), table.num_rows)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            continue
+        if compacted is not None and compacted.nbytes < table.column(i).nbytes:
+            changes[field.name] = f"{field.type} → {_type_label(compacted.type)}"
+            table = table.set_column(i, field.name, compacted)
+
+    report = {"before": before, "after": table.nbytes, "columns": changes}
+    metadata = dict(table.schema.metadata or {})
+    metadata[REPORT_KEY] = json.dumps(report).encode("utf-8")
+    return table.replace_schema_metadata(metadata)
+
+
+def restore_types(table: pa.Table) -> pa.Table:
+    # Undoes compact_table for engines that compute on the stored type:
+    # int8 + int8 overflows, float32 arithmetic rounds. Driven by the report,
+    # so only columns compaction actually changed are cast back.
+    report = compaction_report(table)
+    if not report:
+        return table
+    for name, change in report["columns"].items():
+        i = table.schema.get_field_index(name)
+        original = ORIGINAL_TYPES.get(change.split(" → ")[0])
+        if i < 0 or original is None:
+            continue
+        table = table.set_column(i, table.schema.field(i).with_type(original), table.column(i).cast(original))
+    return table
+
+
+def compaction_report(table: pa.Table):
+    metadata = table.schema.metadata if table is not None else None
+    if not metadata or REPORT_KEY not in metadata:
+        return None
+    return json.loads(metadata[REPORT_KEY])
+
+
+def _int_bounds(arrow_type) -> tuple:
+    bits = arrow_type.bit_width
+    return -(2 ** (bits - 1)), 2 ** (bits - 1) - 1
+
+
+def _type_label(arrow_type) -> str:
+    if pa.types.is_dictionary(arrow_type):
+        return f"dictionary<{arrow_type.index_type}>"
+    return str(arrow_type)
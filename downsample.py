@@ -0,0 +1,80 @@
+import numpy as np
+
+
+# ---------------------------------------------------------
+# Line Charts: LTTB / M4 (x must be sorted)
+# ---------------------------------------------------------
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # First and last points are always kept; n_out - 2 buckets in between
+    k = n_out - 2
+    edges = np.linspace(1, n - 1, k + 1).astype(np.int64)
+    counts = np.diff(edges)
+    avg_x = np.add.reduceat(x[: n - 1], edges[:-1]) / counts
+    avg_y = np.add.reduceat(y[: n - 1], edges[:-1]) / counts
+    next_x = np.append(avg_x[1:], x[n - 1])
+    next_y = np.append(avg_y[1:], y[n - 1])
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0] = 0
+    out[-1] = n - 1
+    a = 0
+    for i in range(k):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs(
+            (x[a] - next_x[i]) * (y[lo:hi] - y[a])
+            - (x[a] - x[lo:hi]) * (next_y[i] - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def m4_indices(x: np.ndarray, y: np.ndarray, n_buckets: int) -> np.ndarray:
+    n = len(x)
+    if n <= 4 * n_buckets:
+        return np.arange(n)
+
+    span = x[-1] - x[0]
+    if span == 0:
+        buckets = np.zeros(n, dtype=np.int64)
+    else:
+        buckets = np.minimum(((x - x[0]) / span * n_buckets).astype(np.int64), n_buckets - 1)
+
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], n] - 1
+
+    # Sorted by bucket then y: each bucket's first entry is its min, last its max
+    order = np.lexsort((y, buckets))
+    keep = np.concatenate([starts, ends, order[starts], order[ends]])
+    return np.unique(keep)
+
+
+# ---------------------------------------------------------
+# Scatter Charts: 2D binning (optionally per group)
+# ---------------------------------------------------------
+def _bin_index(values: np.ndarray, bins: int) -> np.ndarray:
+    lo, hi = values.min(), values.max()
+    if hi == lo:
+        return np.zeros(len(values), dtype=np.int64)
+    return np.minimum(((values - lo) / (hi - lo) * bins).astype(np.int64), bins - 1)
+
+
+def bin2d(x: np.ndarray, y: np.ndarray, bins: int, groups: np.ndarray = None) -> dict:
+    xi = _bin_index(x, bins)
+    yi = _bin_index(y, bins)
+    g = np.zeros(len(x), dtype=np.int64) if groups is None else groups.astype(np.int64)
+
+    key = (g * bins + xi) * bins + yi
+    uniq, inverse, counts = np.unique(key, return_inverse=True, return_counts=True)
+
+    # Bin position is the mean of its points, not the cell center
+    return {
+        "x": np.bincount(inverse, weights=x) / counts,
+        "y": np.bincount(inverse, weights=y) / counts,
+        "count": counts,
+        "group": uniq // (bins * bins),
+    }
@@ -0,0 +1,186 @@
+import pyarrow as pa
+import pyarrow.compute as pc
+from google.cloud import bigquery
+
+from arrow_results import rows_to_arrow
+from pushdown import quote_identifier
+from result_cache import normalize_sql
+
+
+PARTITIONS_QUERY = """
+    SELECT partition_id, CAST(last_modified_time AS STRING) AS last_modified
+    FROM `{project}.{dataset}.INFORMATION_SCHEMA.PARTITIONS`
+    WHERE table_name = @table_name
+"""
+
+
+def parameter_type(arrow_type) -> str:
+    if pa.types.is_timestamp(arrow_type):
+        return "TIMESTAMP" if arrow_type.tz else "DATETIME"
+    if pa.types.is_date(arrow_type):
+        return "DATE"
+    if pa.types.is_integer(arrow_type):
+        return "INT64"
+    if pa.types.is_floating(arrow_type):
+        return "FLOAT64"
+    if pa.types.is_decimal(arrow_type):
+        return "BIGNUMERIC" if pa.types.is_decimal256(arrow_type) else "NUMERIC"
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return "STRING"
+    raise ValueError(f"Unsupported watermark column type: {arrow_type}")
+
+
+def build_incremental_query(base_query: str, column: str) -> str:
+    # Inclusive: rows sharing the watermark value are re-fetched and replaced
+    return (
+        f"SELECT *\n"
+        f"FROM (\n{normalize_sql(base_query)}\n)\n"
+        f"WHERE {quote_identifier(column)} >= @watermark"
+    )
+
+
+def rewrites_history(previous: dict, current: dict, append_only: bool = False) -> bool:
+    # True when a change touched anything older than the newest partition.
+    # Unpartitioned tables can't tell an append from an UPDATE / DELETE / MERGE,
+    # so any change counts unless the caller vouches for append-only tables.
+    for table, version in current.items():
+        before = previous.get(table)
+        if before is None:
+            return True
+
+        old_parts, new_parts = before.get("partitions"), version.get("partitions")
+        if new_parts is None:
+            if not append_only and before.get("modified") != version.get("modified"):
+                return True
+            continue
+        if old_parts is None or old_parts == new_parts:
+            continue
+
+        # __NULL__ / __UNPARTITIONED__ etc. are not ordered
+        ordered = [int(p) for p in old_parts if p.isdigit()]
+        if not ordered:
+            return True
+        newest = max(ordered)
+
+        changed = {p for p, ts in new_parts.items() if old_parts.get(p) != ts}
+        changed |= set(old_parts) - set(new_parts)
+        if any(p.isdigit() and int(p) < newest for p in changed):
+            return True
+
+    return False
+
+
+# ---------------------------------------------------------
+# Incremental Refresh (watermark + append, cached on disk)
+# ---------------------------------------------------------
+class IncrementalRefresher:
+    def __init__(self, cache):
+        self.cache = cache
+
+    # -----------------------------
+    # Public API
+    # -----------------------------
+    def refresh(
+        self, client, query: str, column: str, tables: list, max_bytes_billed: int = None, append_only: bool = False
+    ):
+        # Returns (table, info); info["mode"] is "full", "incremental" or "unchanged"
+        key = self.cache.key_for(query, f"{client.project}:incremental:{column}")
+        meta = self.cache.meta(key) or {}
+        previous = meta.get("versions", {})
+        versions = self._table_versions(client, tables, previous)
+
+        cached = self.cache.get(key)
+        if cached is not None and column in cached.column_names and not rewrites_history(previous, versions, append_only):
+            watermark = pc.max(cached[column])
+            streaming = any(v["streaming"] for v in versions.values())
+
+            # Without referenced tables there is nothing to compare against
+            if tables and versions == previous and not streaming:
+                return cached, {"mode": "unchanged", "new_rows": 0, "watermark": watermark.as_py()}
+
+            if watermark.is_valid:
+                fetched = self._fetch_since(client, query, column, watermark, max_bytes_billed)
+                table = self._merge(cached, fetched, column, watermark)
+                if table is not None:
+                    self.cache.put(key, table, meta={"versions": versions})
+                    return table, {
+                        "mode": "incremental",
+                        "new_rows": table.num_rows - cached.num_rows,
+                        "watermark": pc.max(table[column]).as_py(),
+                    }
+
+        rows = client.query_and_wait(query, job_config=self._job_config(max_bytes_billed))
+        table = rows_to_arrow(rows)
+        if column not in table.column_names:
+            raise ValueError(f"Watermark column `{column}` is not in the query result.")
+
+        self.cache.put(key, table, meta={"versions": versions})
+        return table, {
+            "mode": "full",
+            "new_rows": table.num_rows,
+            "watermark": pc.max(table[column]).as_py(),
+        }
+
+    # -----------------------------
+    # Internals
+    # -----------------------------
+    def _job_config(self, max_bytes_billed: int = None, parameters: list = None):
+        job_config = bigquery.QueryJobConfig(query_parameters=parameters or [])
+        if max_bytes_billed:
+            job_config.maximum_bytes_billed = int(max_bytes_billed)
+        return job_config
+
+    def _fetch_since(self, client, query, column, watermark, max_bytes_billed):
+        parameter = bigquery.ScalarQueryParameter(
+            "watermark", parameter_type(watermark.type), watermark.as_py()
+        )
+        rows = client.query_and_wait(
+            build_incremental_query(query, column),
+            job_config=self._job_config(max_bytes_billed, [parameter]),
+        )
+        return rows_to_arrow(rows)
+
+    def _merge(self, cached, fetched, column, watermark):
+        # Keep rows below the watermark (and NULLs, which are never re-fetched)
+        keep = pc.fill_null(pc.less(cached[column], watermark), True)
+        kept = cached.filter(keep)
+        if fetched.schema.names != kept.schema.names:
+            return None
+        try:
+            fetched = fetched.cast(kept.schema)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            # Column types drifted: caller falls back to a full refresh
+            return None
+        return pa.concat_tables([kept, fetched]).combine_chunks()
+
+    def _table_versions(self, client, tables: list, previous: dict) -> dict:
+        versions = {}
+        for ref in tables:
+            table = client.get_table(ref)
+            modified = table.modified.isoformat() if table.modified else None
+            version = {
+                "modified": modified,
+                "streaming": table.streaming_buffer is not None,
+                "partitions": None,
+            }
+
+            partitioned = table.time_partitioning is not None or table.range_partitioning is not None
+            before = previous.get(ref)
+            if partitioned:
+                # INFORMATION_SCHEMA is billed, so only when the table changed
+                if before is not None and before["modified"] == modified:
+                    version["partitions"] = before["partitions"]
+                else:
+                    version["partitions"] = self._partitions(client, table)
+
+            versions[ref] = version
+        return versions
+
+    def _partitions(self, client, table) -> dict:
+        rows = client.query_and_wait(
+            PARTITIONS_QUERY.format(project=table.project, dataset=table.dataset_id),
+            job_config=bigquery.QueryJobConfig(
+                query_parameters=[bigquery.ScalarQueryParameter("table_name", "STRING", table.table_id)]
+            ),
+        )
+        return {row["partition_id"]: row["last_modified"] for row in rows}
@@ -0,0 +1,34 @@
+import pyarrow as pa
+
+from compaction import restore_types
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+
+LOCAL_TABLE = "last_result"
+
+
+# ---------------------------------------------------------
+# Local SQL Engine (DuckDB over the Arrow result)
+# ---------------------------------------------------------
+class LocalEngine:
+    def __init__(self):
+        if duckdb is None:
+            raise ImportError("duckdb is not installed. Run `pip install duckdb`.")
+
+        # Sessions share the host: no file, HTTP or extension access
+        self._conn = duckdb.connect(":memory:", config={"enable_external_access": False})
+        self._conn.execute("SET lock_configuration = true")
+
+    def query(self, table: pa.Table, sql: str, params: list = None) -> pa.Table:
+        # Arrow scan in place; nothing is copied into DuckDB, and the table is
+        # only referenced for the duration of the query so it can be spilled.
+        # Compacted columns go back to their original types so SQL sees BigQuery's.
+        self._conn.register(LOCAL_TABLE, restore_types(table))
+        try:
+            return self._conn.execute(sql, params or []).fetch_arrow_table()
+        finally:
+            self._conn.unregister(LOCAL_TABLE)
@@ -0,0 +1,195 @@
+import atexit
+import os
+import shutil
+import threading
+import time
+import uuid
+import weakref
+
+import pyarrow as pa
+
+
+class _Entry:
+    def __init__(self, table: pa.Table, lease=None):
+        self.table = table
+        self.frame = None
+        self.path = None
+        self.lease = lease
+        self.nbytes = table.nbytes
+        self.last_access = time.time()
+
+    @property
+    def shared(self) -> bool:
+        # A lease without a store is a private copy (publish failed)
+        return self.lease is not None and self.lease.shared
+
+    @property
+    def resident(self) -> bool:
+        return self.table is not None and not self.shared
+
+
+# ---------------------------------------------------------
+# Memory Governor (per-session tracking, spill to Arrow IPC)
+# ---------------------------------------------------------
+class MemoryGovernor:
+    def __init__(self, spill_dir: str, process_budget: int, session_budget: int, large_result_bytes: int):
+        # One directory per process; files never outlive the process that wrote them
+        self.spill_dir = os.path.join(spill_dir, str(os.getpid()))
+        self.process_budget = process_budget
+        self.session_budget = session_budget
+        self.large_result_bytes = large_result_bytes
+        self._entries = {}
+        self._lock = threading.RLock()
+        self.spills = 0
+        self.reloads = 0
+
+        shutil.rmtree(self.spill_dir, ignore_errors=True)
+        os.makedirs(self.spill_dir)
+        atexit.register(shutil.rmtree, self.spill_dir, ignore_errors=True)
+
+    # -----------------------------
+    # Public API
+    # -----------------------------
+    def put(self, session_id: str, key: str, table: pa.Table, lease=None):
+        # With a shared lease the table is a read-only mapping: it is already
+        # on disk and costs no private memory. Any lease is released with the entry
+        with self._lock:
+            self._drop((session_id, key))
+            if table is None:
+                if lease is not None:
+                    lease.release()
+                return
+
+            entry = _Entry(table, lease)
+            self._entries[(session_id, key)] = entry
+            if entry.shared:
+                return
+
+            if entry.nbytes >= self.large_result_bytes:
+                # Large results go straight to a memory-mapped file
+                self._spill(entry)
+                self._reload(entry)
+
+            self._enforce(keep=(session_id, key))
+
+    def get(self, session_id: str, key: str):
+        with self._lock:
+            entry = self._entries.get((session_id, key))
+            if entry is None:
+                return None
+
+            entry.last_access = time.time()
+            if entry.table is None:
+                self._reload(entry)
+                self._enforce(keep=(session_id, key))
+            return entry.table
+
+    def frame(self, session_id: str, key: str, build):
+        # Derived pandas view, dropped together with the table on spill
+        with self._lock:
+            table = self.get(session_id, key)
+            if table is None:
+                return None
+            entry = self._entries[(session_id, key)]
+            if entry.frame is None:
+                entry.frame = build(table)
+            return entry.frame
+
+    def release(self, session_id: str, key: str):
+        with self._lock:
+            self._drop((session_id, key))
+
+    def release_session(self, session_id: str):
+        with self._lock:
+            for entry_key in [k for k in self._entries if k[0] == session_id]:
+                self._drop(entry_key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            sessions = {}
+            for (session_id, key), entry in self._entries.items():
+                row = sessions.setdefault(
+                    session_id, {"resident_bytes": 0, "spilled_bytes": 0, "shared_bytes": 0, "keys": []}
+                )
+                row[_bucket(entry)] += entry.nbytes
+                row["keys"].append(key)
+
+            return {
+                "resident_bytes": self._resident_bytes(),
+                "spilled_bytes": sum(e.nbytes for e in self._entries.values() if _bucket(e) == "spilled_bytes"),
+                "shared_bytes": sum(e.nbytes for e in self._entries.values() if e.shared),
+                "process_budget": self.process_budget,
+                "session_budget": self.session_budget,
+                "entries": len(self._entries),
+                "spills": self.spills,
+                "reloads": self.reloads,
+                "sessions": sessions,
+            }
+
+    # -----------------------------
+    # Internals (caller holds lock)
+    # -----------------------------
+    def _resident_bytes(self, session_id: str = None) -> int:
+        return sum(
+            e.nbytes for (sid, _), e in self._entries.items()
+            if e.resident and (session_id is None or sid == session_id)
+        )
+
+    def _enforce(self, keep=None):
+        # Coldest first; the entry being handed out is never spilled
+        for session_id in {sid for sid, _ in self._entries}:
+            self._spill_until(lambda: self._resident_bytes(session_id) <= self.session_budget,
+                              session_id=session_id, keep=keep)
+        self._spill_until(lambda: self._resident_bytes() <= self.process_budget, keep=keep)
+
+    def _spill_until(self, satisfied, session_id=None, keep=None):
+        candidates = sorted(
+            (
+                (entry.last_access, entry_key)
+                for entry_key, entry in self._entries.items()
+                if entry.resident and entry_key != keep
+                and (session_id is None or entry_key[0] == session_id)
+            ),
+        )
+        for _, entry_key in candidates:
+            if satisfied():
+                return
+            self._spill(self._entries[entry_key])
+
+    def _spill(self, entry: _Entry):
+        if entry.path is None:
+            entry.path = os.path.join(self.spill_dir, f"{uuid.uuid4().hex}.arrow")
+            with pa.OSFile(entry.path, "wb") as sink:
+                with pa.ipc.new_file(sink, entry.table.schema) as writer:
+                    writer.write_table(entry.table)
+        entry.table = None
+        entry.frame = None
+        self.spills += 1
+
+    def _reload(self, entry: _Entry):
+        source = pa.memory_map(entry.path, "r")
+        entry.table = pa.ipc.open_file(source).read_all()
+        self.reloads += 1
+
+    def _drop(self, entry_key):
+        entry = self._entries.pop(entry_key, None)
+        if entry is not None and entry.lease is not None:
+            entry.lease.release()
+        if entry is not None and entry.path:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+
+def _bucket(entry: _Entry) -> str:
+    if entry.shared:
+        return "shared_bytes"
+    return "resident_bytes" if entry.resident else "spilled_bytes"
+
+
+class SessionLease:
+    # Lives in session_state; the session's entries go when the session does
+    def __init__(self, governor: MemoryGovernor, session_id: str):
+        self.session_id = session_id
+        weakref.finalize(self, governor.release_session, session_id)
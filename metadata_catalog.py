@@ -0,0 +1,310 @@
+import os
+import sqlite3
+import threading
+import time
+
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS refreshes (
+    scope TEXT PRIMARY KEY,
+    refreshed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS datasets (
+    project TEXT NOT NULL,
+    dataset_id TEXT NOT NULL,
+    PRIMARY KEY (project, dataset_id)
+);
+CREATE TABLE IF NOT EXISTS tables (
+    project TEXT NOT NULL,
+    dataset_id TEXT NOT NULL,
+    table_id TEXT NOT NULL,
+    table_type TEXT,
+    PRIMARY KEY (project, dataset_id, table_id)
+);
+CREATE TABLE IF NOT EXISTS columns (
+    project TEXT NOT NULL,
+    dataset_id TEXT NOT NULL,
+    table_id TEXT NOT NULL,
+    column_name TEXT NOT NULL,
+    ordinal INTEGER,
+    data_type TEXT,
+    is_nullable TEXT,
+    description TEXT,
+    PRIMARY KEY (project, dataset_id, table_id, column_name)
+);
+"""
+
+COLUMNS_QUERY = """
+    SELECT
+        c.table_name,
+        c.column_name,
+        c.ordinal_position,
+        c.data_type,
+        c.is_nullable,
+        p.description
+    FROM `{project}.{dataset}.INFORMATION_SCHEMA.COLUMNS` AS c
+    LEFT JOIN `{project}.{dataset}.INFORMATION_SCHEMA.COLUMN_FIELD_PATHS` AS p
+        ON p.table_name = c.table_name AND p.field_path = c.column_name
+"""
+
+
+def column_mode(data_type: str, is_nullable: str) -> str:
+    if (data_type or "").startswith("ARRAY<"):
+        return "REPEATED"
+    return "REQUIRED" if is_nullable == "NO" else "NULLABLE"
+
+
+# ---------------------------------------------------------
+# Metadata Catalog (SQLite, stale-while-revalidate)
+# ---------------------------------------------------------
+class MetadataCatalog:
+    def __init__(self, path: str, ttl: float):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        self._refreshing = set()
+        # (project, dataset) -> (refreshed_at, {table_id: [column dicts]})
+        self._column_index = {}
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(SCHEMA_SQL)
+        self._conn.commit()
+
+    # -----------------------------
+    # Public API
+    # -----------------------------
+    def datasets(self, client, project: str) -> list:
+        scope = f"datasets:{project}"
+        self._ensure_fresh(scope, lambda: self._load_datasets(client, project))
+        return self._column(
+            "SELECT dataset_id FROM datasets WHERE project = ? ORDER BY dataset_id",
+            (project,),
+        )
+
+    def tables(self, client, project: str, dataset: str) -> list:
+        scope = f"tables:{project}.{dataset}"
+        self._ensure_fresh(scope, lambda: self._load_tables(client, project, dataset))
+        return self._column(
+            "SELECT table_id FROM tables WHERE project = ? AND dataset_id = ? ORDER BY table_id",
+            (project, dataset),
+        )
+
+    def columns(self, client, project: str, dataset: str) -> dict:
+        # Every table's columns for the dataset, from one INFORMATION_SCHEMA query
+        scope = f"columns:{project}.{dataset}"
+        self._ensure_fresh(scope, lambda: self._load_columns(client, project, dataset))
+        refreshed_at = self._refreshed_at(scope)
+
+        with self._lock:
+            cached = self._column_index.get((project, dataset))
+            if cached and cached[0] == refreshed_at:
+                return cached[1]
+
+            by_table = {}
+            rows = self._conn.execute(
+                """
+                SELECT table_id, column_name, data_type, is_nullable, description
+                FROM columns WHERE project = ? AND dataset_id = ?
+                ORDER BY table_id, ordinal
+                """,
+                (project, dataset),
+            )
+            for table_id, name, data_type, is_nullable, description in rows:
+                by_table.setdefault(table_id, []).append({
+                    "name": name,
+                    "type": data_type,
+                    "mode": column_mode(data_type, is_nullable),
+                    "description": description,
+                })
+
+            self._column_index[(project, dataset)] = (refreshed_at, by_table)
+            return by_table
+
+    def table_columns(self, client, project: str, dataset: str, table_id: str):
+        return self.columns(client, project, dataset).get(table_id)
+
+    def warm_tables(self, client, project: str):
+        # Fill in table lists for every dataset (list_tables is free) so search covers them
+        with self._lock:
+            if f"warm:{project}" in self._refreshing:
+                return
+            self._refreshing.add(f"warm:{project}")
+
+        def worker():
+            try:
+                for dataset in self._column(
+                    "SELECT dataset_id FROM datasets WHERE project = ?", (project,)
+                ):
+                    scope = f"tables:{project}.{dataset}"
+                    if self._refreshed_at(scope) is None:
+                        try:
+                            self._run_loader(scope, lambda: self._load_tables(client, project, dataset))
+                        except Exception:
+                            continue
+            finally:
+                with self._lock:
+                    self._refreshing.discard(f"warm:{project}")
+
+        threading.Thread(target=worker, name=f"catalog-warm-{project}", daemon=True).start()
+
+    def version(self) -> tuple:
+        # Changes whenever any scope is (re)loaded
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*), COALESCE(MAX(refreshed_at), 0) FROM refreshes"
+            ).fetchone()
+
+    def search_documents(self, project: str) -> list:
+        with self._lock:
+            docs = [
+                {"kind": "dataset", "dataset": d, "table": None, "column": None, "description": None}
+                for (d,) in self._conn.execute(
+                    "SELECT dataset_id FROM datasets WHERE project = ?", (project,)
+                )
+            ]
+            docs += [
+                {"kind": "table", "dataset": d, "table": t, "column": None, "description": None}
+                for d, t in self._conn.execute(
+                    "SELECT dataset_id, table_id FROM tables WHERE project = ?", (project,)
+                )
+            ]
+            docs += [
+                {"kind": "column", "dataset": d, "table": t, "column": c, "description": desc}
+                for d, t, c, desc in self._conn.execute(
+                    """
+                    SELECT dataset_id, table_id, column_name, description
+                    FROM columns WHERE project = ?
+                    """,
+                    (project,),
+                )
+            ]
+        return docs
+
+    def invalidate(self, scope_prefix: str = ""):
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM refreshes WHERE scope LIKE ?", (f"{scope_prefix}%",)
+            )
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = {
+                name: self._conn.execute(f"SELECT COUNT(*) FROM {name}").fetchone()[0]
+                for name in ("datasets", "tables", "columns", "refreshes")
+            }
+        counts["refreshing"] = len(self._refreshing)
+        return counts
+
+    # -----------------------------
+    # Freshness
+    # -----------------------------
+    def _refreshed_at(self, scope: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT refreshed_at FROM refreshes WHERE scope = ?", (scope,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _ensure_fresh(self, scope: str, loader):
+        refreshed_at = self._refreshed_at(scope)
+
+        if refreshed_at is None:
+            # Nothing to serve yet: load inline
+            self._run_loader(scope, loader)
+            return
+
+        if time.time() - refreshed_at > self.ttl:
+            self._refresh_in_background(scope, loader)
+
+    def _refresh_in_background(self, scope: str, loader):
+        with self._lock:
+            if scope in self._refreshing:
+                return
+            self._refreshing.add(scope)
+
+        def worker():
+            try:
+                self._run_loader(scope, loader)
+            except Exception:
+                # Keep serving the stale copy; next access retries
+                pass
+            finally:
+                with self._lock:
+                    self._refreshing.discard(scope)
+
+        threading.Thread(target=worker, name=f"catalog-{scope}", daemon=True).start()
+
+    def _run_loader(self, scope: str, loader):
+        statements = loader()
+        with self._lock:
+            with self._conn:
+                for sql, params in statements:
+                    # list -> many rows, tuple -> single statement
+                    if isinstance(params, list):
+                        self._conn.executemany(sql, params)
+                    else:
+                        self._conn.execute(sql, params)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO refreshes (scope, refreshed_at) VALUES (?, ?)",
+                    (scope, time.time()),
+                )
+
+    def _column(self, sql: str, params: tuple) -> list:
+        with self._lock:
+            return [row[0] for row in self._conn.execute(sql, params)]
+
+    # -----------------------------
+    # Loaders (network calls happen outside the lock)
+    # -----------------------------
+    @staticmethod
+    def _load_datasets(client, project: str):
+        rows = [(project, d.dataset_id) for d in client.list_datasets(project=project)]
+        return [
+            ("DELETE FROM datasets WHERE project = ?", (project,)),
+            ("INSERT INTO datasets (project, dataset_id) VALUES (?, ?)", rows),
+        ]
+
+    @staticmethod
+    def _load_tables(client, project: str, dataset: str):
+        rows = [
+            (project, dataset, t.table_id, getattr(t, "table_type", None))
+            for t in client.list_tables(f"{project}.{dataset}")
+        ]
+        return [
+            ("DELETE FROM tables WHERE project = ? AND dataset_id = ?", (project, dataset)),
+            (
+                "INSERT INTO tables (project, dataset_id, table_id, table_type) VALUES (?, ?, ?, ?)",
+                rows,
+            ),
+        ]
+
+    @staticmethod
+    def _load_columns(client, project: str, dataset: str):
+        query = COLUMNS_QUERY.format(project=project, dataset=dataset)
+        rows = [
+            (
+                project,
+                dataset,
+                row["table_name"],
+                row["column_name"],
+                row["ordinal_position"],
+                row["data_type"],
+                row["is_nullable"],
+                row["description"],
+            )
+            for row in client.query_and_wait(query)
+        ]
+        return [
+            ("DELETE FROM columns WHERE project = ? AND dataset_id = ?", (project, dataset)),
+            (
+                """
+                INSERT OR REPLACE INTO columns
+                    (project, dataset_id, table_id, column_name, ordinal,
+                     data_type, is_nullable, description)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            ),
+        ]
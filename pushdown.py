@@ -0,0 +1,63 @@
+import pyarrow as pa
+
+from result_cache import normalize_sql
+
+
+AGGREGATIONS = {
+    "COUNT": "COUNT(*)",
+    "SUM": "SUM({y})",
+    "AVG": "AVG({y})",
+    "MEDIAN (approx)": "APPROX_QUANTILES({y}, 2)[OFFSET(1)]",
+    "P90 (approx)": "APPROX_QUANTILES({y}, 100)[OFFSET(90)]",
+}
+TIME_BUCKETS = ["HOUR", "DAY", "WEEK", "MONTH", "QUARTER", "YEAR"]
+
+
+def quote_identifier(name: str) -> str:
+    return "`" + name.replace("\\", "\\\\").replace("`", "\\`") + "`"
+
+
+def time_trunc_expr(column: str, arrow_type, bucket: str) -> str:
+    # DATE / DATETIME / TIMESTAMP each have their own TRUNC function
+    if pa.types.is_date(arrow_type):
+        if bucket == "HOUR":
+            bucket = "DAY"
+        return f"DATE_TRUNC({column}, {bucket})"
+    if pa.types.is_timestamp(arrow_type) and arrow_type.tz is None:
+        return f"DATETIME_TRUNC({column}, {bucket})"
+    return f"TIMESTAMP_TRUNC({column}, {bucket})"
+
+
+# ---------------------------------------------------------
+# Aggregate Query Builder (wraps the user's SQL)
+# ---------------------------------------------------------
+def build_aggregate_query(
+    base_query: str,
+    x: str,
+    y: str,
+    aggregation: str,
+    x_arrow_type=None,
+    time_bucket: str = None,
+    cast_y: bool = False,
+    max_groups: int = 5000,
+):
+    # Returns (sql, x_alias, y_alias)
+    y_ref = quote_identifier(y)
+    if cast_y:
+        y_ref = f"SAFE_CAST({y_ref} AS FLOAT64)"
+
+    x_ref = quote_identifier(x)
+    if time_bucket and x_arrow_type is not None:
+        x_ref = time_trunc_expr(x_ref, x_arrow_type, time_bucket)
+
+    y_alias = y if y != x else f"{aggregation.split()[0].lower()}_{y}"
+    agg_expr = AGGREGATIONS[aggregation].format(y=y_ref)
+
+    sql = (
+        f"SELECT {x_ref} AS {quote_identifier(x)}, {agg_expr} AS {quote_identifier(y_alias)}\n"
+        f"FROM (\n{normalize_sql(base_query)}\n)\n"
+        f"GROUP BY 1\n"
+        f"ORDER BY 1\n"
+        f"LIMIT {int(max_groups)}"
+    )
+    return sql, x, y_alias
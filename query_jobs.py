@@ -0,0 +1,106 @@
+import contextlib
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+# ---------------------------------------------------------
+# Background Query Job
+# ---------------------------------------------------------
+class QueryJobHandle:
+    def __init__(self, query: str, job=None, future=None):
+        # job stays None until the worker is admitted and inserts it
+        self.id = uuid.uuid4().hex[:8]
+        self.query = query
+        self.job = job
+        self.future = future
+        self.submitted_at = time.time()
+        self.finished_at = None
+        self.cancel_requested = False
+
+    @property
+    def job_id(self) -> str:
+        return getattr(self.job, "job_id", "") or ""
+
+    @property
+    def done(self) -> bool:
+        return self.future.done()
+
+    @property
+    def state(self) -> str:
+        if self.cancel_requested:
+            return "CANCELLED" if self.done else "CANCELLING"
+        if not self.done:
+            if self.job is None:
+                return "QUEUED"
+            return getattr(self.job, "state", None) or "PENDING"
+        return "FAILED" if self.future.exception() else "DONE"
+
+    @property
+    def elapsed(self) -> float:
+        end = self.finished_at or time.time()
+        return end - self.submitted_at
+
+    @property
+    def bytes_processed(self):
+        return getattr(self.job, "total_bytes_processed", None)
+
+    def refresh(self):
+        # One jobs.get call; keeps state / bytes processed current while running
+        if self.done:
+            if self.finished_at is None:
+                self.finished_at = time.time()
+            return
+        if self.job is None:
+            return
+        try:
+            self.job.reload()
+        except Exception:
+            pass
+
+    def cancel(self):
+        self.cancel_requested = True
+        if self.job is not None:
+            try:
+                self.job.cancel()
+            except Exception:
+                pass
+        self.future.cancel()
+
+    def result(self):
+        return self.future.result()
+
+
+# ---------------------------------------------------------
+# Executor (shared by all sessions in the process)
+# ---------------------------------------------------------
+class QueryJobRunner:
+    def __init__(self, max_workers: int):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="bq-job"
+        )
+        self._lock = threading.Lock()
+        self.submitted = 0
+
+    def submit(self, client, query: str, fetch, job_config=None, slot=None) -> QueryJobHandle:
+        # slot(cancelled) -> context manager (admission) held while the job runs;
+        # cancelled() lets a queued job give up its place. Inserting, waiting
+        # and fetching all happen off-thread.
+        handle = QueryJobHandle(query)
+
+        def run():
+            cancelled = lambda: handle.cancel_requested
+            with slot(cancelled) if slot else contextlib.nullcontext():
+                if handle.cancel_requested:
+                    return None
+                handle.job = client.query(query, job_config=job_config)
+                if handle.cancel_requested:
+                    # Cancelled while the insert was in flight
+                    handle.cancel()
+                return fetch(handle.job.result())
+
+        handle.future = self._executor.submit(run)
+        with self._lock:
+            self.submitted += 1
+        return handle
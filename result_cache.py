@@ -0,0 +1,290 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: no cross-process lock, so give each process its own cache root
+    fcntl = None
+
+
+# ---------------------------------------------------------
+# SQL Fingerprint
+# ---------------------------------------------------------
+def normalize_sql(query: str) -> str:
+    # Drop comments, collapse whitespace and trailing semicolons,
+    # but leave quoted literals and identifiers untouched.
+    out = []
+    i = 0
+    n = len(query)
+    pending_space = False
+
+    while i < n:
+        ch = query[i]
+
+        if ch in ("'", '"', "`"):
+            end = i + 1
+            while end < n and query[end] != ch:
+                end += 2 if query[end] == "\\" else 1
+            if pending_space and out:
+                out.append(" ")
+            pending_space = False
+            out.append(query[i:end + 1])
+            i = end + 1
+            continue
+
+        if query.startswith("--", i) or ch == "#":
+            end = query.find("\n", i)
+            i = n if end == -1 else end
+            pending_space = True
+            continue
+
+        if query.startswith("/*", i):
+            end = query.find("*/", i + 2)
+            i = n if end == -1 else end + 2
+            pending_space = True
+            continue
+
+        if ch.isspace():
+            pending_space = True
+            i += 1
+            continue
+
+        if pending_space and out:
+            out.append(" ")
+        pending_space = False
+        out.append(ch)
+        i += 1
+
+    return "".join(out).rstrip("; ").strip()
+
+
+def split_statements(script: str) -> list:
+    # Split on top-level semicolons; quotes and comments are respected
+    statements = []
+    start = 0
+    i = 0
+    n = len(script)
+
+    while i < n:
+        ch = script[i]
+
+        if ch in ("'", '"', "`"):
+            end = i + 1
+            while end < n and script[end] != ch:
+                end += 2 if script[end] == "\\" else 1
+            i = end + 1
+            continue
+
+        if script.startswith("--", i) or ch == "#":
+            end = script.find("\n", i)
+            i = n if end == -1 else end
+            continue
+
+        if script.startswith("/*", i):
+            end = script.find("*/", i + 2)
+            i = n if end == -1 else end + 2
+            continue
+
+        if ch == ";":
+            statements.append(script[start:i])
+            start = i + 1
+        i += 1
+
+    statements.append(script[start:])
+    return [s.strip() for s in statements if normalize_sql(s)]
+
+
+def query_fingerprint(query: str, project: str = "") -> str:
+    payload = f"{project or ''}\x00{normalize_sql(query)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ---------------------------------------------------------
+# Persistent Result Cache (Parquet files + JSON index)
+# ---------------------------------------------------------
+class ResultCache:
+    INDEX_FILE = "index.json"
+    LOCK_FILE = "index.lock"
+
+    def __init__(self, root: str, max_bytes: int, default_ttl: float):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._index = {}
+
+        os.makedirs(self.root, exist_ok=True)
+        with self._index_lock():
+            self._drop_orphans()
+
+    # -----------------------------
+    # Public API
+    # -----------------------------
+    def key_for(self, query: str, project: str = "") -> str:
+        return query_fingerprint(query, project)
+
+    def get(self, key: str):
+        with self._index_lock():
+            entry = self._index.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            if entry["expires_at"] < time.time():
+                self._remove(key)
+                self._save_index()
+                self.misses += 1
+                return None
+
+        # Read outside the lock; another replica may evict the file meanwhile
+        try:
+            table = pq.read_table(self._path(key))
+        except (OSError, pa.ArrowInvalid):
+            with self._index_lock():
+                current = self._index.get(key)
+                if current is not None and current["created"] == entry["created"]:
+                    self._remove(key)
+                    self._save_index()
+                self.misses += 1
+            return None
+
+        with self._index_lock():
+            if key in self._index:
+                self._index[key]["last_access"] = time.time()
+                self._save_index()
+            self.hits += 1
+        return table
+
+    def put(self, key: str, table: pa.Table, ttl: float = None, meta: dict = None):
+        ttl = self.default_ttl if ttl is None else ttl
+
+        # Unique temp name: replicas may write the same key at once
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        pq.write_table(table, tmp_path)
+
+        with self._index_lock():
+            os.replace(tmp_path, path)
+
+            now = time.time()
+            self._index[key] = {
+                "bytes": os.path.getsize(path),
+                "rows": table.num_rows,
+                "created": now,
+                "last_access": now,
+                "expires_at": now + ttl,
+                "meta": meta,
+            }
+            self._evict()
+            self._save_index()
+
+    def meta(self, key: str):
+        # JSON metadata stored with the entry; no hit/miss accounting
+        with self._index_lock():
+            entry = self._index.get(key)
+            return None if entry is None else entry.get("meta")
+
+    def invalidate(self, key: str):
+        with self._index_lock():
+            if key in self._index:
+                self._remove(key)
+                self._save_index()
+
+    def clear(self):
+        with self._index_lock():
+            for key in list(self._index):
+                self._remove(key)
+            self._save_index()
+
+    def stats(self) -> dict:
+        with self._index_lock():
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._index),
+                "bytes": sum(e["bytes"] for e in self._index.values()),
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
+
+    # -----------------------------
+    # Internals (caller holds the index lock)
+    # -----------------------------
+    @contextmanager
+    def _index_lock(self):
+        # Replicas may share root: index.json is the source of truth and is
+        # re-read under an exclusive file lock before every read or change
+        with self._lock:
+            with open(os.path.join(self.root, self.LOCK_FILE), "a") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    self._index = self._load_index()
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.parquet")
+
+    def _remove(self, key: str):
+        self._index.pop(key, None)
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        now = time.time()
+        for key in [k for k, e in self._index.items() if e["expires_at"] < now]:
+            self._remove(key)
+
+        total = sum(e["bytes"] for e in self._index.values())
+        if total <= self.max_bytes:
+            return
+
+        # Least recently used first
+        for key, entry in sorted(self._index.items(), key=lambda kv: kv[1]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            total -= entry["bytes"]
+            self._remove(key)
+
+    def _load_index(self) -> dict:
+        try:
+            with open(os.path.join(self.root, self.INDEX_FILE)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self):
+        path = os.path.join(self.root, self.INDEX_FILE)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, path)
+
+    def _drop_orphans(self):
+        # Index entries whose file vanished, and files the index forgot about.
+        # Under the lock, so a replica's put (rename + index update) is never half seen.
+        for key in [k for k in self._index if not os.path.exists(self._path(k))]:
+            self._index.pop(key)
+
+        for name in os.listdir(self.root):
+            if name.endswith(".parquet") and name[: -len(".parquet")] not in self._index:
+                os.remove(os.path.join(self.root, name))
+
+        self._save_index()
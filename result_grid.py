@@ -0,0 +1,112 @@
+import threading
+from collections import OrderedDict
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+
+# ---------------------------------------------------------
+# Vectorized Sort / Filter (Arrow compute kernels)
+# ---------------------------------------------------------
+def sort_indices(table: pa.Table, column: str, descending: bool = False) -> pa.Array:
+    order = "descending" if descending else "ascending"
+    values = table[column]
+    if pa.types.is_dictionary(values.type):
+        # No sort kernel for dictionaries; sort the decoded values
+        values = values.cast(values.type.value_type)
+    return pc.sort_indices(pa.table({column: values}), sort_keys=[(column, order)], null_placement="at_end")
+
+
+def filter_mask(table: pa.Table, column: str, text: str) -> pa.Array:
+    # Case-insensitive "contains" on the column's string form; NULL never matches
+    values = table[column]
+    if not (pa.types.is_string(values.type) or pa.types.is_large_string(values.type)):
+        values = pc.cast(values, pa.string())
+    matches = pc.match_substring(values, text, ignore_case=True)
+    return pc.fill_null(matches, False).combine_chunks()
+
+
+# ---------------------------------------------------------
+# Index Cache (sort orders / filter masks per result)
+# ---------------------------------------------------------
+class GridIndexCache:
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+
+        # Computed outside the lock; a racing duplicate just overwrites
+        value = compute()
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._evict()
+        return value
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": sum(v.nbytes for v in self._entries.values()),
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _evict(self):
+        total = sum(v.nbytes for v in self._entries.values())
+        while total > self.max_bytes and len(self._entries) > 1:
+            _, value = self._entries.popitem(last=False)
+            total -= value.nbytes
+
+
+# ---------------------------------------------------------
+# Grid View (row positions for the current sort / filter)
+# ---------------------------------------------------------
+def view_indices(
+    table: pa.Table,
+    cache: GridIndexCache,
+    fingerprint: str,
+    filter_column: str = None,
+    filter_text: str = "",
+    sort_column: str = None,
+    descending: bool = False,
+):
+    # None means "all rows in storage order" (pages are zero-copy slices).
+    # The cache is process-wide, so fingerprint must name this exact table
+    # (not its query); row count is a cheap second guard.
+    table_key = (fingerprint, table.num_rows)
+    order = None
+    if sort_column:
+        order = cache.get_or_compute(
+            (table_key, "sort", sort_column, descending),
+            lambda: sort_indices(table, sort_column, descending),
+        )
+
+    if not (filter_column and filter_text):
+        return order
+
+    mask = cache.get_or_compute(
+        (table_key, "filter", filter_column, filter_text),
+        lambda: filter_mask(table, filter_column, filter_text),
+    )
+    if order is None:
+        return pc.indices_nonzero(mask)
+    return pc.filter(order, pc.array_take(mask, order))
+
+
+def page(table: pa.Table, indices, offset: int, limit: int) -> pa.Table:
+    if indices is None:
+        return table.slice(offset, limit)
+    return table.take(indices.slice(offset, limit))
@@ -0,0 +1,247 @@
+import atexit
+import os
+import threading
+import time
+import uuid
+
+import pyarrow as pa
+
+
+RESULT_SUFFIX = ".arrow"
+LEASE_DIR = "leases"
+
+
+class SharedResult:
+    # One reference to a mapped result; release() exactly once
+    def __init__(self, store, key: str, table: pa.Table, published: float = None):
+        self._store = store
+        self.key = key
+        self.table = table
+        # mtime of the mapped file: key + published names exactly these rows
+        self.published = published
+        self._released = False
+
+    @property
+    def shared(self) -> bool:
+        return self._store is not None
+
+    def release(self):
+        if self._released:
+            return
+        self._released = True
+        if self._store is not None:
+            self._store._release(self.key)
+
+
+class _Mapping:
+    def __init__(self, table: pa.Table, published: float, refs: int = 0):
+        self.table = table
+        self.published = published
+        self.refs = refs
+
+
+# ---------------------------------------------------------
+# Shared Result Store (Arrow IPC files, mapped read-only)
+# ---------------------------------------------------------
+class SharedResultStore:
+    def __init__(self, root: str, max_bytes: int, ttl: float, idle_ttl: float, sweep_interval: float = 60.0):
+        # Every process on the host that points at `root` maps the same files,
+        # so the page cache holds one copy of each result.
+        # mtime is the publish time (ttl), atime the last use (idle_ttl).
+        self.root = root
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.idle_ttl = idle_ttl
+        self.sweep_interval = sweep_interval
+        self.publishes = 0
+        self.acquires = 0
+        self.swept = 0
+        self._mapped = {}
+        self._lock = threading.Lock()
+        self._last_sweep = 0.0
+
+        os.makedirs(os.path.join(self.root, LEASE_DIR), exist_ok=True)
+        atexit.register(self._release_all)
+        self.sweep()
+
+    # -----------------------------
+    # Public API
+    # -----------------------------
+    def acquire(self, key: str):
+        with self._lock:
+            mapping = self._mapped.get(key)
+            if mapping is None:
+                # Lease first: a concurrent sweep then leaves the file alone,
+                # and an unlink that already happened can't break a mapping
+                self._write_lease(key)
+
+            try:
+                published = os.stat(self._path(key)).st_mtime
+                if time.time() - published > self.ttl:
+                    raise FileNotFoundError(key)
+                if mapping is None or mapping.published != published:
+                    # Re-published since we mapped it: new readers get the new file,
+                    # existing holders keep the old mapping until they release
+                    mapping = _Mapping(self._map(key), published, mapping.refs if mapping else 0)
+            except (OSError, pa.ArrowInvalid):
+                if key not in self._mapped:
+                    self._remove_lease(key)
+                return None
+
+            self._mapped[key] = mapping
+            mapping.refs += 1
+            self.acquires += 1
+            self._touch(key)
+            return SharedResult(self, key, mapping.table, mapping.published)
+
+    def publish(self, key: str, table: pa.Table) -> SharedResult:
+        # Written once per host; later callers (any process) just map it
+        result = self.acquire(key)
+        if result is not None:
+            return result
+
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+        try:
+            with pa.OSFile(tmp_path, "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(tmp_path, path)
+        except OSError:
+            # Disk full / read-only: the caller keeps its private copy
+            _remove(tmp_path)
+            return SharedResult(None, key, table)
+
+        with self._lock:
+            self.publishes += 1
+        self._maybe_sweep()
+
+        return self.acquire(key) or SharedResult(None, key, table)
+
+    def sweep(self):
+        # Drops leases of dead processes, then unleased results that went idle
+        # or no longer fit in max_bytes (least recently used first)
+        with self._lock:
+            self._last_sweep = time.time()
+            lease_dir = os.path.join(self.root, LEASE_DIR)
+            leased = set()
+            for name in os.listdir(lease_dir):
+                key, _, pid = name.rpartition(".")
+                if pid.isdigit() and _process_alive(int(pid)):
+                    leased.add(key)
+                else:
+                    _remove(os.path.join(lease_dir, name))
+
+            now = time.time()
+            files = []
+            for name in os.listdir(self.root):
+                path = os.path.join(self.root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                if name.endswith(".tmp"):
+                    if now - stat.st_mtime > self.idle_ttl:
+                        _remove(path)
+                elif name.endswith(RESULT_SUFFIX):
+                    files.append((stat.st_atime, stat.st_mtime, name[: -len(RESULT_SUFFIX)], stat.st_size))
+
+            total = sum(size for _, _, _, size in files)
+            for last_used, published, key, size in sorted(files):
+                if key in leased:
+                    continue
+                if now - last_used > self.idle_ttl or now - published > self.ttl or total > self.max_bytes:
+                    _remove(self._path(key))
+                    total -= size
+                    self.swept += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            files = [n for n in os.listdir(self.root) if n.endswith(RESULT_SUFFIX)]
+            return {
+                "files": len(files),
+                "bytes": sum(_size(os.path.join(self.root, n)) for n in files),
+                "max_bytes": self.max_bytes,
+                "leases": len(os.listdir(os.path.join(self.root, LEASE_DIR))),
+                "mapped_here": len(self._mapped),
+                "mapped_bytes_here": sum(m.table.nbytes for m in self._mapped.values()),
+                "refs_here": sum(m.refs for m in self._mapped.values()),
+                "publishes": self.publishes,
+                "acquires": self.acquires,
+                "swept": self.swept,
+            }
+
+    # -----------------------------
+    # Internals
+    # -----------------------------
+    def _release(self, key: str):
+        with self._lock:
+            mapping = self._mapped.get(key)
+            if mapping is None:
+                return
+            mapping.refs -= 1
+            if mapping.refs > 0:
+                return
+            # Last reference in this process: unmap once the table is collected
+            del self._mapped[key]
+            self._remove_lease(key)
+            self._touch(key)
+
+    def _release_all(self):
+        with self._lock:
+            for key in list(self._mapped):
+                self._remove_lease(key)
+            self._mapped.clear()
+
+    def _maybe_sweep(self):
+        if time.time() - self._last_sweep >= self.sweep_interval:
+            self.sweep()
+
+    def _map(self, key: str) -> pa.Table:
+        source = pa.memory_map(self._path(key), "r")
+        return pa.ipc.open_file(source).read_all()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}{RESULT_SUFFIX}")
+
+    def _lease_path(self, key: str) -> str:
+        return os.path.join(self.root, LEASE_DIR, f"{key}.{os.getpid()}")
+
+    def _write_lease(self, key: str):
+        with open(self._lease_path(key), "w"):
+            pass
+
+    def _remove_lease(self, key: str):
+        _remove(self._lease_path(key))
+
+    def _touch(self, key: str):
+        # Last use goes in atime; mtime stays the publish time
+        path = self._path(key)
+        try:
+            os.utime(path, (time.time(), os.stat(path).st_mtime))
+        except OSError:
+            pass
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except FileNotFoundError:
+        return 0
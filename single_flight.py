@@ -0,0 +1,60 @@
+import threading
+from concurrent.futures import Future
+
+
+class _Abandoned(Exception):
+    pass
+
+
+# ---------------------------------------------------------
+# Single Flight (one call per key in flight; the rest wait on it)
+# ---------------------------------------------------------
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        # Returns (result, leader). Followers get the leader's result or exception.
+        while True:
+            with self._lock:
+                future = self._calls.get(key)
+                leader = future is None
+                if leader:
+                    future = self._calls[key] = Future()
+                    self.leaders += 1
+                else:
+                    self.coalesced += 1
+
+            if not leader:
+                try:
+                    return future.result(), False
+                except _Abandoned:
+                    # The leader's script was stopped / rerun: run it ourselves
+                    continue
+
+            try:
+                result = fn()
+            except Exception as e:
+                future.set_exception(e)
+                raise
+            except BaseException:
+                # Streamlit stop / rerun signals belong to the leader's session only
+                future.set_exception(_Abandoned())
+                raise
+            else:
+                future.set_result(result)
+                return result, True
+            finally:
+                with self._lock:
+                    self._calls.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+            }
@@ -0,0 +1,331 @@
+import bisect
+import contextvars
+import http.server
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+MAX_PENDING_SPANS = 100
+
+_current_trace = contextvars.ContextVar("explorer_trace", default=None)
+_current_span = contextvars.ContextVar("explorer_span", default=None)
+
+
+class Span:
+    def __init__(self, name: str, trace_id: str, parent_id: str = None, attributes: dict = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attributes = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.error = None
+
+    @property
+    def seconds(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+
+class Trace:
+    def __init__(self, name: str, attributes: dict = None):
+        self.trace_id = uuid.uuid4().hex
+        self.root = Span(name, self.trace_id, attributes=attributes)
+        self.spans = [self.root]
+        self._lock = threading.Lock()
+
+    def add(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+    def adopt(self, spans: list):
+        # Spans recorded on this thread before the trace opened (widget callbacks)
+        with self._lock:
+            for span in spans:
+                span.trace_id = self.trace_id
+                if span.parent_id is None:
+                    span.parent_id = self.root.span_id
+                self.spans.append(span)
+            if spans:
+                self.root.start_ns = min(self.root.start_ns, min(s.start_ns for s in spans))
+
+    def waterfall(self) -> list:
+        # Rows for the in-app panel: offsets in ms from the trace start
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start_ns)
+        start = self.root.start_ns
+        depth = {}
+        rows = []
+        for span in spans:
+            depth[span.span_id] = depth.get(span.parent_id, -1) + 1
+            rows.append({
+                "span": "  " * depth[span.span_id] + span.name,
+                "start_ms": (span.start_ns - start) / 1e6,
+                "end_ms": ((span.end_ns or time.time_ns()) - start) / 1e6,
+                "duration_ms": span.seconds * 1e3,
+                "error": span.error or "",
+            })
+        return rows
+
+
+# ---------------------------------------------------------
+# Metrics Registry (Prometheus text exposition)
+# ---------------------------------------------------------
+class MetricsRegistry:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._histograms = {}
+        self._counters = {}
+        self._gauges = {}
+        self._help = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name: str, help_text: str):
+        self._help[name] = help_text
+
+    def observe(self, name: str, value: float, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                hist["counts"][index] += 1
+            hist["sum"] += value
+            hist["count"] += 1
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def set(self, name: str, value: float, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._gauges[key] = value
+
+    def histogram_summary(self, name: str) -> list:
+        with self._lock:
+            return [
+                {**dict(labels), "count": h["count"], "sum": h["sum"]}
+                for (metric, labels), h in self._histograms.items()
+                if metric == name
+            ]
+
+    def prometheus_text(self) -> str:
+        lines = []
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+            gauges = sorted(self._gauges.items())
+
+        seen = set()
+        for (name, labels), hist in histograms:
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# HELP {name} {self._help.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+            cumulative = 0
+            for bound, count in zip(self.buckets, hist["counts"]):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(labels, le=_number(bound))} {cumulative}")
+            lines.append(f"{name}_bucket{_labels(labels, le='+Inf')} {hist['count']}")
+            lines.append(f"{name}_sum{_labels(labels)} {_number(hist['sum'])}")
+            lines.append(f"{name}_count{_labels(labels)} {hist['count']}")
+
+        for (name, labels), value in counters:
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# HELP {name} {self._help.get(name, name)}")
+                lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name}{_labels(labels)} {_number(value)}")
+
+        for (name, labels), value in gauges:
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# HELP {name} {self._help.get(name, name)}")
+                lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name}{_labels(labels)} {_number(value)}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _number(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels, **extra) -> str:
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+# ---------------------------------------------------------
+# Tracer (per-rerun traces, per-stage spans)
+# ---------------------------------------------------------
+class Tracer:
+    STAGE_METRIC = "explorer_stage_duration_seconds"
+    ERROR_METRIC = "explorer_stage_errors_total"
+
+    def __init__(self, registry: MetricsRegistry = None, keep_traces: int = 200, service_name: str = "bigquery-explorer"):
+        self.registry = registry or MetricsRegistry()
+        self.registry.describe(self.STAGE_METRIC, "Time spent in each explorer stage.")
+        self.registry.describe(self.ERROR_METRIC, "Explorer stages that raised.")
+        self.service_name = service_name
+        self._traces = deque(maxlen=keep_traces)
+        self._pending = threading.local()
+
+    @contextmanager
+    def trace(self, name: str, **attributes):
+        # Inside an open trace (a fragment during a full rerun) this is just a span
+        outer = _current_trace.get()
+        if outer is not None:
+            with self.span(name, **attributes):
+                yield outer
+            return
+
+        trace = Trace(name, attributes)
+        trace.adopt(self._take_pending())
+        trace_token = _current_trace.set(trace)
+        span_token = _current_span.set(trace.root)
+        try:
+            yield trace
+        except Exception as e:
+            trace.root.error = type(e).__name__
+            raise
+        finally:
+            _current_span.reset(span_token)
+            _current_trace.reset(trace_token)
+            self._finish(trace.root)
+            self._traces.append(trace)
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        trace = _current_trace.get()
+        parent = _current_span.get()
+        span = Span(
+            name,
+            trace.trace_id if trace else None,
+            parent.span_id if parent else None,
+            attributes,
+        )
+        token = _current_span.set(span)
+        try:
+            yield span
+        except Exception as e:
+            # Streamlit's rerun / stop signals are BaseExceptions and pass untouched
+            span.error = type(e).__name__
+            raise
+        finally:
+            _current_span.reset(token)
+            self._finish(span)
+            if trace is not None:
+                trace.add(span)
+            else:
+                self._keep_pending(span)
+
+    def recent_traces(self) -> list:
+        return list(self._traces)
+
+    def otlp_json(self) -> dict:
+        # OTLP/JSON ExportTraceServiceRequest shape
+        spans = []
+        for trace in self.recent_traces():
+            for span in list(trace.spans):
+                spans.append({
+                    "traceId": trace.trace_id,
+                    "spanId": span.span_id,
+                    "parentSpanId": span.parent_id or "",
+                    "name": span.name,
+                    "kind": 1,
+                    "startTimeUnixNano": str(span.start_ns),
+                    "endTimeUnixNano": str(span.end_ns or span.start_ns),
+                    "attributes": [
+                        {"key": k, "value": {"stringValue": str(v)}}
+                        for k, v in span.attributes.items()
+                    ],
+                    "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+                })
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [
+                    {"key": "service.name", "value": {"stringValue": self.service_name}},
+                    {"key": "process.pid", "value": {"intValue": str(os.getpid())}},
+                ]},
+                "scopeSpans": [{"scope": {"name": "explorer.tracing"}, "spans": spans}],
+            }]
+        }
+
+    def _finish(self, span: Span):
+        span.end_ns = time.time_ns()
+        self.registry.observe(self.STAGE_METRIC, span.seconds, stage=span.name)
+        if span.error:
+            self.registry.inc(self.ERROR_METRIC, stage=span.name)
+
+    def _keep_pending(self, span: Span):
+        pending = getattr(self._pending, "spans", None)
+        if pending is None:
+            pending = self._pending.spans = deque(maxlen=MAX_PENDING_SPANS)
+        pending.append(span)
+
+    def _take_pending(self) -> list:
+        pending = getattr(self._pending, "spans", None)
+        if not pending:
+            return []
+        spans = list(pending)
+        pending.clear()
+        return spans
+
+
+# ---------------------------------------------------------
+# Metrics Endpoint (/metrics, /traces)
+# ---------------------------------------------------------
+class MetricsServer:
+    def __init__(self, tracer: Tracer, host: str = "127.0.0.1", port: int = 9464):
+        tracer_ref = tracer
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split("?")[0]
+                if path == "/metrics":
+                    body = tracer_ref.registry.prometheus_text().encode("utf-8")
+                    content_type = "text/plain; version=0.0.4; charset=utf-8"
+                elif path == "/traces":
+                    body = json.dumps(tracer_ref.otlp_json()).encode("utf-8")
+                    content_type = "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = http.server.ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self.host, self.port = self._server.server_address[:2]
+        threading.Thread(target=self._server.serve_forever, name="explorer-metrics", daemon=True).start()
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()